@@ -0,0 +1,57 @@
+"""
+CrownDesk V2 - AI Service Audio Helpers
+Conversions for Twilio Media Streams (8 kHz mono G.711 mu-law).
+"""
+
+import io
+import wave
+
+import numpy as np
+
+# Twilio media stream format
+TWILIO_SAMPLE_RATE = 8000
+
+
+def _mulaw_decode_table() -> np.ndarray:
+    """PCM16 sample for each of the 256 mu-law byte values (ITU-T G.711)."""
+    encoded = ~np.arange(256, dtype=np.uint8)
+    exponent = (encoded >> 4) & 0x07
+    mantissa = (encoded & 0x0F).astype(np.int32)
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(encoded & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+# Decoding is a single table lookup per sample
+MULAW_TO_PCM16 = _mulaw_decode_table()
+
+
+def mulaw_to_pcm16(audio: bytes) -> np.ndarray:
+    """Decode mu-law bytes (or any bytes-like buffer, without copying) to PCM16 samples."""
+    return MULAW_TO_PCM16[np.frombuffer(audio, dtype=np.uint8)]
+
+
+def mulaw_to_wav(audio: bytes) -> bytes:
+    """Wrap mu-law call audio as a PCM16 WAV file for speech-to-text."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(TWILIO_SAMPLE_RATE)
+        wav.writeframes(mulaw_to_pcm16(audio).tobytes())
+    return buffer.getvalue()
+
+
+# RMS level above which a frame counts as speech. Line noise on a quiet
+# call sits well below this; normal speech is several times higher
+SPEECH_RMS_THRESHOLD = 500.0
+
+# Squared PCM16 value per mu-law byte, so frame energy is one lookup and a mean
+MULAW_ENERGY = MULAW_TO_PCM16.astype(np.float32) ** 2
+
+
+def is_speech(audio: bytes, threshold: float = SPEECH_RMS_THRESHOLD) -> bool:
+    """Energy-based voice activity check for one mu-law frame."""
+    if not audio:
+        return False
+    # Compare mean energy to the squared threshold rather than taking a root
+    return float(MULAW_ENERGY[np.frombuffer(audio, dtype=np.uint8)].mean()) > threshold * threshold
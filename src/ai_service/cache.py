@@ -0,0 +1,104 @@
+"""
+CrownDesk V2 - AI Service In-Process Caches
+Small per-worker caches for repeated lookups on latency-sensitive paths.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+import orjson
+
+from ai_service.config import get_settings
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after ``ttl`` seconds.
+
+    ``get_or_load`` also coalesces concurrent misses for the same key, so a
+    burst of identical lookups reaches the backend once.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] = lambda value: True,
+    ) -> Any:
+        """Return the cached value for key, loading it at most once concurrently."""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+
+            def _store(done: asyncio.Task) -> None:
+                self._inflight.pop(key, None)
+                if not done.cancelled() and done.exception() is None and should_cache(done.result()):
+                    self.set(key, done.result())
+
+            task.add_done_callback(_store)
+
+        # Shielded so one caller going away does not cancel the shared load
+        return await asyncio.shield(task)
+
+
+# Word tokens kept when folding free text into a cache key
+_WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def normalized_text(text: str) -> str:
+    """Fold case, punctuation and spacing out of text before keying on it."""
+    return " ".join(_WORD_PATTERN.findall(text.lower()))
+
+
+def llm_cache_key(*parts: Any) -> str:
+    """Stable SHA-256 key over everything that determines an LLM result."""
+    return hashlib.sha256(orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+@lru_cache
+def get_llm_cache() -> TTLCache:
+    """
+    Process-wide cache of parsed results from deterministic LLM calls.
+
+    Only calls made at temperature 0.3 or below go through it, where a
+    repeated prompt would get the same answer anyway.
+    """
+    settings = get_settings()
+    return TTLCache(maxsize=settings.llm_cache_size, ttl=settings.llm_cache_ttl)
@@ -0,0 +1,102 @@
+"""
+CrownDesk V2 - AI Service Shared API Clients
+Process-wide LLM clients so TLS sessions and keepalive connections persist
+across requests.
+"""
+
+import asyncio
+from functools import lru_cache
+
+import httpx
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+
+from ai_service.config import get_settings
+
+# Connections beyond the semaphore-bounded LLM and embedding calls, for
+# callers that are not behind either semaphore (voice agent, health checks)
+CONNECTION_HEADROOM = 16
+
+
+def _http_limits() -> httpx.Limits:
+    """
+    Connection pool sized so requests queue at the semaphores, not in httpx.
+
+    A pool smaller than the semaphores would let admitted requests wait on
+    httpx's pool timeout instead.
+    """
+    settings = get_settings()
+    connections = (
+        settings.openai_llm_concurrency
+        + settings.openai_embedding_concurrency
+        + CONNECTION_HEADROOM
+    )
+    return httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+
+
+@lru_cache
+def get_openai_client() -> AsyncOpenAI:
+    """Get the shared OpenAI client."""
+    settings = get_settings()
+    if not settings.openai_api_key:
+        raise ValueError("OpenAI API key not configured")
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        http_client=httpx.AsyncClient(
+            limits=_http_limits(),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        ),
+    )
+
+
+@lru_cache
+def get_anthropic_client() -> AsyncAnthropic:
+    """Get the shared Anthropic client."""
+    settings = get_settings()
+    if not settings.anthropic_api_key:
+        raise ValueError("Anthropic API key not configured")
+    return AsyncAnthropic(
+        api_key=settings.anthropic_api_key,
+        http_client=httpx.AsyncClient(
+            limits=_http_limits(),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        ),
+    )
+
+
+@lru_cache
+def get_embedding_semaphore() -> asyncio.Semaphore:
+    """Semaphore bounding concurrent embedding requests across the process."""
+    return asyncio.Semaphore(get_settings().openai_embedding_concurrency)
+
+
+@lru_cache
+def get_llm_semaphore() -> asyncio.Semaphore:
+    """
+    Semaphore bounding concurrent chat completions across the process.
+
+    Bursts queue here instead of piling onto the upstream API, which keeps
+    tail latency flat rather than collapsing under rate-limit retries.
+    """
+    return asyncio.Semaphore(get_settings().openai_llm_concurrency)
+
+
+async def warm_clients() -> None:
+    """
+    Open a keepalive connection on the shared OpenAI client at startup.
+
+    Fetching model metadata is free and resolves DNS and completes the TLS
+    handshake, so the first classification or embedding after a worker
+    restart does not pay connection setup.
+    """
+    await get_openai_client().models.retrieve(get_settings().openai_embedding_model)
+
+
+async def close_clients() -> None:
+    """Close shared clients on shutdown."""
+    if get_openai_client.cache_info().currsize:
+        await get_openai_client().close()
+        get_openai_client.cache_clear()
+    if get_anthropic_client.cache_info().currsize:
+        await get_anthropic_client().close()
+        get_anthropic_client.cache_clear()
@@ -0,0 +1,81 @@
+"""
+CrownDesk V2 - AI Service Database Pool
+Shared asyncpg connection pool, created during the FastAPI lifespan.
+"""
+
+import asyncio
+from typing import Optional
+
+import asyncpg
+from pgvector.asyncpg import register_vector
+
+from ai_service.config import get_settings
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """Per-connection setup: register the pgvector codec."""
+    await register_vector(conn)
+
+
+async def init_db() -> asyncpg.Pool:
+    """
+    Create the shared pool and warm it before traffic arrives.
+
+    asyncpg opens ``min_size`` connections when the pool is created; acquiring
+    them all once more runs the init hook and a round-trip on each, so the
+    first requests never pay connection setup or TLS handshake latency.
+    """
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            settings = get_settings()
+            _pool = await asyncpg.create_pool(
+                dsn=settings.database_url,
+                min_size=settings.db_pool_min_size,
+                max_size=settings.db_pool_max_size,
+                init=_init_connection,
+                # Queries are prepared once per connection and their plans
+                # reused on every later call with the same SQL text
+                statement_cache_size=settings.db_statement_cache_size,
+                # Applied at connection startup, so vector searches pay no
+                # per-query SET round-trip
+                server_settings={"hnsw.ef_search": str(settings.db_hnsw_ef_search)},
+            )
+            # Acquired together so each is a distinct connection. Failures
+            # are collected rather than raised at once, so every connection
+            # that was acquired is released
+            acquired = await asyncio.gather(
+                *[_pool.acquire() for _ in range(settings.db_pool_min_size)],
+                return_exceptions=True,
+            )
+            conns = [conn for conn in acquired if not isinstance(conn, BaseException)]
+            try:
+                results = await asyncio.gather(
+                    *[conn.execute("SELECT 1") for conn in conns],
+                    return_exceptions=True,
+                )
+            finally:
+                for conn in conns:
+                    await _pool.release(conn)
+            for result in [*acquired, *results]:
+                if isinstance(result, BaseException):
+                    raise result
+    return _pool
+
+
+async def get_pool() -> asyncpg.Pool:
+    """Get the shared pool, creating it lazily if the lifespan did not run."""
+    if _pool is None:
+        return await init_db()
+    return _pool
+
+
+async def close_db() -> None:
+    """Close the shared pool on shutdown."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
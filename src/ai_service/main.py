@@ -8,9 +8,20 @@ from typing import AsyncGenerator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
+from ai_service.clients import close_clients, warm_clients
 from ai_service.config import get_settings
+from ai_service.db import close_db, init_db
 from ai_service.routers import coding, feedback, health, intent, rag, retell, voice_agent
+from ai_service.routers.feedback import FeedbackService
+from ai_service.routers.voice_agent import VoiceAgentService
+from ai_service.services.ai_orchestrator import AIOrchestrator
+from ai_service.services.coding_service import CodingService
+from ai_service.services.guardrails import HIPAAGuardrails
+from ai_service.services.intent_service import IntentBatcher, IntentService
+from ai_service.services.rag_service import RAGService
+from ai_service.services.retell_service import RetellService
 
 
 @asynccontextmanager
@@ -20,14 +31,46 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     settings = get_settings()
     print(f"Starting {settings.app_name}...")
 
-    # Initialize database connection pool
-    # await init_db()
+    # Initialize and warm the shared database connection pool
+    try:
+        app.state.pg_pool = await init_db()
+    except Exception as e:
+        # Services fall back to creating the pool on first use
+        print(f"Database pool warm-up failed: {e}")
+
+    # Stateless services shared across requests
+    app.state.rag_service = RAGService()
+    app.state.feedback_service = FeedbackService(app.state.rag_service)
+    app.state.coding_service = CodingService()
+    app.state.intent_service = IntentService()
+    app.state.retell_service = RetellService(settings)
+    app.state.ai_orchestrator = AIOrchestrator(settings)
+    app.state.guardrails = HIPAAGuardrails()
+    app.state.voice_service = VoiceAgentService()
+
+    # Micro-batch concurrent intent classification
+    app.state.intent_batcher = IntentBatcher(
+        app.state.intent_service,
+        max_batch=settings.intent_batch_max,
+        window_ms=settings.intent_batch_window_ms,
+    )
+    app.state.intent_batcher.start()
+
+    # Open upstream LLM connections before accepting traffic
+    try:
+        await warm_clients()
+    except Exception as e:
+        print(f"OpenAI client warm-up failed: {e}")
 
     yield
 
     # Shutdown
     print("Shutting down AI service...")
-    # await close_db()
+    await app.state.intent_batcher.stop()
+    await app.state.retell_service.close()
+    await app.state.voice_service.close()
+    await close_db()
+    await close_clients()
 
 
 def create_app() -> FastAPI:
@@ -42,16 +85,21 @@ def create_app() -> FastAPI:
         docs_url="/docs",
         redoc_url="/redoc",
     )
+    app.state.settings = settings
 
-    # CORS middleware
+    # CORS middleware (explicit origins; preflight cached for a day)
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=["*"],  # Configure properly in production
+        allow_origins=settings.cors_allowed_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        max_age=86400,
     )
 
+    # Compress larger JSON payloads (stats, code search, retrain results)
+    app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
+
     # Include routers
     app.include_router(health.router, tags=["health"])
     app.include_router(rag.router, prefix="/rag", tags=["rag"])
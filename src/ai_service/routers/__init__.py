@@ -1,4 +1 @@
 # Routers package
-from ai_service.routers import coding, feedback, health, intent, rag, retell, voice_agent
-
-__all__ = ["coding", "feedback", "health", "intent", "rag", "retell", "voice_agent"]
@@ -92,20 +92,11 @@ async def suggest_codes(
             patient_id=request.patient_id,
             appointment_id=request.appointment_id,
         )
-        return CodingSuggestionResponse(
-            suggestions=[
-                CDTSuggestion(
-                    code=s["code"],
-                    description=s["description"],
-                    confidence=s["confidence"],
-                    reasoning=s["reasoning"],
-                    requires_approval=s["requires_approval"],
-                )
-                for s in result["suggestions"]
-            ],
-            raw_notes=request.clinical_notes,
-            processing_time_ms=result["processing_time_ms"],
-        )
+        return {
+            "suggestions": result["suggestions"],
+            "raw_notes": request.clinical_notes,
+            "processing_time_ms": result["processing_time_ms"],
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -126,13 +117,7 @@ async def validate_code(
             code=request.code,
             clinical_notes=request.clinical_notes,
         )
-        return ValidateCodeResponse(
-            code=request.code,
-            is_valid=result["is_valid"],
-            confidence=result["confidence"],
-            issues=result["issues"],
-            alternative_codes=result["alternative_codes"],
-        )
+        return {"code": request.code, **result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -151,14 +136,6 @@ async def search_codes(
             category=category,
             limit=limit,
         )
-        return [
-            CDTCodeInfo(
-                code=c["code"],
-                description=c["description"],
-                category=c["category"],
-                fee_range=c.get("fee_range"),
-            )
-            for c in codes
-        ]
+        return codes
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
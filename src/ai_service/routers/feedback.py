@@ -12,17 +12,17 @@ and uses it to improve the RAG embeddings.
 """
 
 import logging
-from typing import Any, Dict, List, Optional
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel, Field
 
-from ai_service.services.rag_service import RAGService, get_rag_service
-from ai_service.config import get_settings
+from ai_service.services.rag_service import RAGService
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
 
 router = APIRouter()
 
@@ -31,11 +31,22 @@ router = APIRouter()
 # Request/Response Models
 # =============================================================================
 
+# Agent types with a training content format; anything else is rejected
+# at request validation, before any embedding call.
+AgentType = Literal[
+    "CDT_CODER",
+    "PA_GENERATOR",
+    "APPEAL_GENERATOR",
+    "DENIAL_ANALYZER",
+    "CODE_VALIDATOR",
+]
+
+
 class TrainingExample(BaseModel):
     """Single training example from feedback."""
     
     id: str
-    agentType: str = Field(..., description="Type of AI agent: CDT_CODER, PA_GENERATOR, etc.")
+    agentType: AgentType = Field(..., description="Type of AI agent: CDT_CODER, PA_GENERATOR, etc.")
     suggestionType: str = Field(..., description="Type of suggestion: code, narrative, appeal")
     originalSuggestion: Any = Field(..., description="What AI originally suggested")
     finalValue: Optional[Any] = Field(None, description="What user actually used (if modified)")
@@ -50,7 +61,7 @@ class RetrainRequest(BaseModel):
     """Request to process feedback batch for retraining."""
     
     tenant_id: str
-    agent_type: str
+    agent_type: AgentType
     training_examples: List[TrainingExample]
 
 
@@ -93,6 +104,83 @@ class RetrainStatsResponse(BaseModel):
     avg_confidence_improvement: Optional[float] = None
 
 
+# =============================================================================
+# SQL Statements (prepared once per pooled connection by the statement cache)
+# =============================================================================
+
+UPSERT_TRAINING_EXAMPLE_SQL = """
+    INSERT INTO training_examples 
+    (tenant_id, feedback_id, agent_type, content, embedding, weight, metadata)
+    VALUES ($1, $2, $3, $4, $5, $6, $7)
+    ON CONFLICT (tenant_id, feedback_id) DO UPDATE
+    SET content = EXCLUDED.content, embedding = EXCLUDED.embedding,
+        weight = EXCLUDED.weight, metadata = EXCLUDED.metadata,
+        updated_at = NOW()
+    RETURNING id
+"""
+
+TRAINING_STATS_SQL = """
+    SELECT agent_type, COUNT(*) as count, MAX(updated_at) as last_at
+    FROM training_examples 
+    WHERE tenant_id = $1 
+    GROUP BY agent_type
+"""
+
+
+# =============================================================================
+# Training Content Formatters (by agent type)
+# =============================================================================
+
+def _format_cdt_coder(value: Any) -> str:
+    """Format: clinical description + CDT code."""
+    if isinstance(value, dict):
+        code = value.get("code", "")
+        description = value.get("description", "")
+        return f"Procedure: {description}\nCDT Code: {code}"
+    return str(value)
+
+
+def _format_pa_generator(value: Any) -> str:
+    """Format: medical necessity narrative."""
+    if isinstance(value, dict):
+        value = value.get("narrative", value.get("text", ""))
+    return f"Pre-Authorization Narrative:\n{value}"
+
+
+def _format_appeal_generator(value: Any) -> str:
+    """Format: appeal letter content."""
+    if isinstance(value, dict):
+        value = value.get("letter", value.get("content", ""))
+    return f"Appeal Letter:\n{value}"
+
+
+def _format_denial_analyzer(value: Any) -> str:
+    """Format: denial analysis and resolution."""
+    if isinstance(value, dict):
+        reason = value.get("reason", "")
+        resolution = value.get("resolution", "")
+        return f"Denial Reason: {reason}\nResolution: {resolution}"
+    return str(value)
+
+
+def _format_code_validator(value: Any) -> str:
+    """Format: code validation rule."""
+    if isinstance(value, dict):
+        code = value.get("code", "")
+        rule = value.get("rule", value.get("validation", ""))
+        return f"Code: {code}\nValidation Rule: {rule}"
+    return str(value)
+
+
+TRAINING_CONTENT_FORMATTERS: Dict[AgentType, Callable[[Any], str]] = {
+    "CDT_CODER": _format_cdt_coder,
+    "PA_GENERATOR": _format_pa_generator,
+    "APPEAL_GENERATOR": _format_appeal_generator,
+    "DENIAL_ANALYZER": _format_denial_analyzer,
+    "CODE_VALIDATOR": _format_code_validator,
+}
+
+
 # =============================================================================
 # Feedback Service (in-module for now, can be extracted later)
 # =============================================================================
@@ -111,7 +199,7 @@ class FeedbackService:
     async def process_feedback_batch(
         self,
         tenant_id: str,
-        agent_type: str,
+        agent_type: AgentType,
         examples: List[TrainingExample],
     ) -> Dict[str, Any]:
         """
@@ -123,49 +211,57 @@ class FeedbackService:
         3. Create embeddings
         4. Store in RAG chunks with special metadata
         """
-        import time
         start_time = time.time()
         
         errors = []
         embedded_count = 0
-        skipped_count = 0
         
-        for example in examples:
+        # Pass 1: filter the whole batch up front, then build training
+        # content only for the examples that will be embedded
+        candidates = [e for e in examples if self._should_create_embedding(e)]
+        skipped_count = len(examples) - len(candidates)
+        
+        to_embed = []
+        for example in candidates:
             try:
-                # Determine if we should create a training embedding
-                should_embed = self._should_create_embedding(example)
-                
-                if not should_embed:
-                    skipped_count += 1
-                    continue
-                
-                # Create training content from feedback
                 training_content = self._create_training_content(agent_type, example)
                 
                 if not training_content:
                     skipped_count += 1
                     continue
                 
-                # Generate embedding and store
-                await self._store_training_embedding(
-                    tenant_id=tenant_id,
-                    agent_type=agent_type,
-                    example_id=example.id,
-                    content=training_content,
-                    weight=example.retrainingWeight,
-                    metadata={
-                        "source": "feedback",
-                        "outcome_action": example.outcomeAction,
-                        "suggestion_type": example.suggestionType,
-                        "external_success": example.externalSuccess,
-                    },
-                )
-                embedded_count += 1
+                to_embed.append((example, training_content))
                 
             except Exception as e:
                 logger.error(f"Failed to process feedback {example.id}: {str(e)}")
                 errors.append(f"{example.id}: {str(e)}")
         
+        # Pass 2 + 3: embed all contents in one request, store in one transaction
+        if to_embed:
+            try:
+                await self._store_training_embeddings(
+                    tenant_id=tenant_id,
+                    agent_type=agent_type,
+                    items=[
+                        (
+                            example.id,
+                            content,
+                            example.retrainingWeight,
+                            {
+                                "source": "feedback",
+                                "outcome_action": example.outcomeAction,
+                                "suggestion_type": example.suggestionType,
+                                "external_success": example.externalSuccess,
+                            },
+                        )
+                        for example, content in to_embed
+                    ],
+                )
+                embedded_count = len(to_embed)
+            except Exception as e:
+                logger.error(f"Failed to store feedback batch: {str(e)}")
+                errors.extend(f"{example.id}: {str(e)}" for example, _ in to_embed)
+        
         processing_time = int((time.time() - start_time) * 1000)
         
         return {
@@ -186,31 +282,19 @@ class FeedbackService:
         - Modified suggestions with high weight (user corrections are valuable)
         - Examples with external success (real-world validation)
         """
-        # Always embed approved suggestions
-        if example.outcomeAction == "approved":
-            return True
-        
-        # Modified suggestions are valuable - user showed us the right answer
-        if example.outcomeAction == "modified" and example.finalValue:
-            return True
-        
-        # External success is strong signal
-        if example.externalSuccess is True:
-            return True
-        
-        # High weight means important for learning
-        if example.retrainingWeight >= 1.5:
-            return True
-        
-        # Skip rejected without corrections - negative signal, harder to learn from
-        if example.outcomeAction == "rejected" and not example.finalValue:
-            return False
-        
-        return False
+        # Rejected without corrections is a negative signal, harder to learn
+        # from, and falls through to False.
+        outcome = example.outcomeAction
+        return (
+            outcome == "approved"  # Confirmed good
+            or (outcome == "modified" and bool(example.finalValue))  # User showed the right answer
+            or example.externalSuccess is True  # Strong real-world signal
+            or example.retrainingWeight >= 1.5  # Important for learning
+        )
     
     def _create_training_content(
         self,
-        agent_type: str,
+        agent_type: AgentType,
         example: TrainingExample,
     ) -> Optional[str]:
         """
@@ -221,57 +305,15 @@ class FeedbackService:
         - PA_GENERATOR: procedure + payer -> narrative
         - APPEAL_GENERATOR: denial reason -> appeal text
         """
+        # Use final value if modified, otherwise original suggestion
+        value = example.finalValue if example.finalValue else example.originalSuggestion
+        
+        if not value:
+            return None
+        
+        formatter = TRAINING_CONTENT_FORMATTERS[agent_type]
         try:
-            # Use final value if modified, otherwise original suggestion
-            value = example.finalValue if example.finalValue else example.originalSuggestion
-            
-            if not value:
-                return None
-            
-            if agent_type == "CDT_CODER":
-                # Format: clinical description + CDT code
-                if isinstance(value, dict):
-                    code = value.get("code", "")
-                    description = value.get("description", "")
-                    return f"Procedure: {description}\nCDT Code: {code}"
-                return str(value)
-            
-            elif agent_type == "PA_GENERATOR":
-                # Format: medical necessity narrative
-                if isinstance(value, dict):
-                    narrative = value.get("narrative", value.get("text", ""))
-                    return f"Pre-Authorization Narrative:\n{narrative}"
-                return f"Pre-Authorization Narrative:\n{value}"
-            
-            elif agent_type == "APPEAL_GENERATOR":
-                # Format: appeal letter content
-                if isinstance(value, dict):
-                    letter = value.get("letter", value.get("content", ""))
-                    return f"Appeal Letter:\n{letter}"
-                return f"Appeal Letter:\n{value}"
-            
-            elif agent_type == "DENIAL_ANALYZER":
-                # Format: denial analysis and resolution
-                if isinstance(value, dict):
-                    reason = value.get("reason", "")
-                    resolution = value.get("resolution", "")
-                    return f"Denial Reason: {reason}\nResolution: {resolution}"
-                return str(value)
-            
-            elif agent_type == "CODE_VALIDATOR":
-                # Format: code validation rule
-                if isinstance(value, dict):
-                    code = value.get("code", "")
-                    rule = value.get("rule", value.get("validation", ""))
-                    return f"Code: {code}\nValidation Rule: {rule}"
-                return str(value)
-            
-            else:
-                # Generic format for unknown agent types
-                if isinstance(value, dict):
-                    return str(value)
-                return str(value)
-                
+            return formatter(value)
         except Exception as e:
             logger.warning(f"Failed to create training content: {e}")
             return None
@@ -289,89 +331,74 @@ class FeedbackService:
         Generate embedding and store as a training chunk.
         
         Training chunks are stored in the same rag_chunks table but with
-        special metadata to distinguish them from document chunks.
+        special metadata to distinguish them from document chunks. Upserts on
+        the (tenant_id, feedback_id) unique index in a single statement.
         """
         # Generate embedding
         embeddings = await self.rag_service._embed_texts([content])
         embedding = embeddings[0]
         
-        # Store in database
+        # Store in database (insert, or refresh an existing example)
         pool = await self._get_pool()
         async with pool.acquire() as conn:
-            # Check if we already have this training example
-            existing = await conn.fetchrow(
-                """
-                SELECT id FROM training_examples 
-                WHERE tenant_id = $1 AND feedback_id = $2
-                """,
+            chunk_id = await conn.fetchval(
+                UPSERT_TRAINING_EXAMPLE_SQL,
                 tenant_id,
                 example_id,
+                agent_type,
+                content,
+                embedding,
+                weight,
+                {**metadata, "agent_type": agent_type, "tenant_id": tenant_id},
             )
-            
-            if existing:
-                # Update existing embedding
-                chunk_id = await conn.fetchval(
-                    """
-                    UPDATE training_examples
-                    SET content = $1, embedding = $2, weight = $3, 
-                        metadata = $4, updated_at = NOW()
-                    WHERE tenant_id = $5 AND feedback_id = $6
-                    RETURNING id
-                    """,
-                    content,
-                    embedding,
-                    weight,
-                    {**metadata, "agent_type": agent_type, "tenant_id": tenant_id},
-                    tenant_id,
-                    example_id,
-                )
-            else:
-                # Insert new training example
-                chunk_id = await conn.fetchval(
-                    """
-                    INSERT INTO training_examples 
-                    (tenant_id, feedback_id, agent_type, content, embedding, weight, metadata)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7)
-                    RETURNING id
-                    """,
-                    tenant_id,
-                    example_id,
-                    agent_type,
-                    content,
-                    embedding,
-                    weight,
-                    {**metadata, "agent_type": agent_type, "tenant_id": tenant_id},
-                )
         
         return str(chunk_id)
     
+    async def _store_training_embeddings(
+        self,
+        tenant_id: str,
+        agent_type: str,
+        items: List[Tuple[str, str, float, Dict[str, Any]]],
+    ) -> None:
+        """
+        Embed and upsert a batch of training examples.
+        
+        Items are (example_id, content, weight, metadata) tuples. All contents
+        go to the embeddings API in a single request and are written with one
+        executemany inside a transaction. Relies on the unique index on
+        training_examples (tenant_id, feedback_id) from the backend schema.
+        """
+        embeddings = await self.rag_service._embed_texts([content for _, content, _, _ in items])
+        
+        rows = [
+            (
+                tenant_id,
+                example_id,
+                agent_type,
+                content,
+                embedding,
+                weight,
+                {**metadata, "agent_type": agent_type, "tenant_id": tenant_id},
+            )
+            for (example_id, content, weight, metadata), embedding in zip(items, embeddings)
+        ]
+        
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany(UPSERT_TRAINING_EXAMPLE_SQL, rows)
+    
     async def get_training_stats(self, tenant_id: str) -> Dict[str, Any]:
         """Get retraining statistics for a tenant."""
         pool = await self._get_pool()
         async with pool.acquire() as conn:
-            # Total count
-            total = await conn.fetchval(
-                "SELECT COUNT(*) FROM training_examples WHERE tenant_id = $1",
-                tenant_id,
-            )
-            
-            # Count by agent type
-            rows = await conn.fetch(
-                """
-                SELECT agent_type, COUNT(*) as count 
-                FROM training_examples 
-                WHERE tenant_id = $1 
-                GROUP BY agent_type
-                """,
-                tenant_id,
-            )
-            by_agent = {row["agent_type"]: row["count"] for row in rows}
-            
-            # Last retrain timestamp (most recent example)
-            last_at = await conn.fetchval(
-                "SELECT MAX(updated_at) FROM training_examples WHERE tenant_id = $1",
-                tenant_id,
-            )
+            # Counts and last update per agent type, in one round-trip
+            rows = await conn.fetch(TRAINING_STATS_SQL, tenant_id)
+        
+        by_agent = {row["agent_type"]: row["count"] for row in rows}
+        total = sum(by_agent.values())
+        # Last retrain timestamp (most recent example)
+        last_at = max((row["last_at"] for row in rows if row["last_at"]), default=None)
         
         return {
             "tenant_id": tenant_id,
@@ -382,11 +409,9 @@ class FeedbackService:
         }
 
 
-def get_feedback_service(
-    rag_service: RAGService = Depends(get_rag_service),
-) -> FeedbackService:
-    """Dependency injection for feedback service."""
-    return FeedbackService(rag_service)
+def get_feedback_service(request: Request) -> FeedbackService:
+    """Dependency injection for feedback service (app-wide singleton)."""
+    return request.app.state.feedback_service
 
 
 # =============================================================================
@@ -438,7 +463,6 @@ async def create_training_example(
     - Seeding initial training data
     """
     try:
-        import uuid
         example_id = str(uuid.uuid4())
         
         chunk_id = await feedback_service._store_training_embedding(
@@ -9,10 +9,17 @@ Endpoints:
 
 from typing import Dict, List, Optional
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from ai_service.services.intent_service import IntentService, get_intent_service
+from ai_service.services.intent_service import (
+    IntentBatcher,
+    IntentService,
+    get_intent_batcher,
+    get_intent_service,
+)
 
 router = APIRouter()
 
@@ -74,7 +81,7 @@ SUPPORTED_INTENTS = [
 @router.post("/classify", response_model=ClassifyIntentResponse)
 async def classify_intent(
     request: ClassifyIntentRequest,
-    intent_service: IntentService = Depends(get_intent_service),
+    intent_batcher: IntentBatcher = Depends(get_intent_batcher),
 ):
     """
     Classify patient intent from text/voice input.
@@ -83,9 +90,12 @@ async def classify_intent(
     - Uses LLM to classify intent
     - Extracts relevant entities (dates, times, procedures)
     - Returns suggested response for voice/chat bot
+
+    Keyword fast-path and cached answers return immediately; requests that
+    need the LLM are coalesced into micro-batches.
     """
     try:
-        result = await intent_service.classify(
+        result = await intent_batcher.classify(
             tenant_id=request.tenant_id,
             message=request.message,
             context=request.context,
@@ -177,6 +187,14 @@ class ChatResponse(BaseModel):
     requires_human: bool = False
 
 
+def _last_user_message(messages: List[ChatMessage]) -> Optional[str]:
+    """Content of the most recent user message, scanning from the end."""
+    for message in reversed(messages):
+        if message.role == "user":
+            return message.content
+    return None
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
@@ -187,15 +205,28 @@ async def chat(
     
     Handles conversational interactions with the AI assistant.
     Supports basic Q&A and appointment-related queries.
+    
+    With ``stream=true`` the reply is sent as Server-Sent Events, one
+    ``{"delta": ...}`` event per token, terminated by ``[DONE]``.
     """
-    try:
-        # Get the last user message
-        user_messages = [m for m in request.messages if m.role == "user"]
-        if not user_messages:
-            raise HTTPException(status_code=400, detail="No user message found")
+    last_message = _last_user_message(request.messages)
+    if last_message is None:
+        raise HTTPException(status_code=400, detail="No user message found")
+    
+    if request.stream:
         
-        last_message = user_messages[-1].content
+        async def event_stream():
+            async for delta in intent_service.stream_chat_response(
+                tenant_id=request.tenant_id or "default",
+                # Only the window the service sends upstream is converted
+                messages=[{"role": m.role, "content": m.content} for m in request.messages[-10:]],
+            ):
+                yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+            yield b"data: [DONE]\n\n"
         
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+    
+    try:
         # Build conversation context
         context = {
             "conversation_history": [
@@ -10,7 +10,9 @@ Endpoints:
 
 from typing import List, Optional
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from ai_service.services.rag_service import RAGService, get_rag_service
@@ -42,6 +44,7 @@ class QueryRequest(BaseModel):
     query: str
     patient_id: Optional[str] = None
     top_k: int = 5
+    stream: bool = False
 
 
 class QueryResponse(BaseModel):
@@ -106,7 +109,33 @@ async def query_knowledge_base(
     2. Vector similarity search in pgvector
     3. Filter by tenant_id (and optionally patient_id)
     4. Generate answer with LLM using retrieved context
+
+    With ``stream=true`` the answer is sent as Server-Sent Events: one
+    ``{"sources": ..., "confidence": ...}`` event once retrieval finishes,
+    then one ``{"delta": ...}`` event per token, terminated by ``[DONE]``.
     """
+    if request.stream:
+        try:
+            sources, context = await rag_service.retrieve(
+                tenant_id=request.tenant_id,
+                query=request.query,
+                patient_id=request.patient_id,
+                top_k=request.top_k,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        async def event_stream():
+            yield b"data: " + orjson.dumps({
+                "sources": sources,
+                "confidence": rag_service.answer_confidence(sources, request.top_k),
+            }) + b"\n\n"
+            async for delta in rag_service.answer_stream(request.query, context):
+                yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+            yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
     try:
         result = await rag_service.query(
             tenant_id=request.tenant_id,
@@ -132,18 +161,11 @@ async def get_document_chunks(
 ):
     """Get all chunks for a specific document."""
     try:
-        chunks = await rag_service.get_chunks(
+        # Rows already match ChunkResponse; the response_model validates
+        # and serializes them in one pass
+        return await rag_service.get_chunks(
             tenant_id=tenant_id,
             document_id=document_id,
         )
-        return [
-            ChunkResponse(
-                id=chunk["id"],
-                content=chunk["content"],
-                chunk_index=chunk["chunk_index"],
-                metadata=chunk["metadata"],
-            )
-            for chunk in chunks
-        ]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
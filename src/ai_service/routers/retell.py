@@ -6,17 +6,20 @@ WebSocket server for Retell AI Custom LLM integration.
 Handles voice conversations, function calling, and human handoff.
 """
 
-import json
+import asyncio
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
-from uuid import uuid4
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Depends, Query
 from pydantic import BaseModel
 
+from ai_service.cache import TTLCache
 from ai_service.config import get_settings
-from ai_service.services.retell_service import RetellService
+from ai_service.services.retell_service import RetellService, get_retell_service
 from ai_service.services.ai_orchestrator import AIOrchestrator
 from ai_service.services.guardrails import HIPAAGuardrails
 
@@ -101,6 +104,18 @@ SYSTEM_PROMPT = """You are a friendly and professional AI receptionist for a den
 When the call starts, greet the patient warmly and ask how you can help them today.
 """
 
+# Static system message sent first on every turn. Together with
+# AVAILABLE_FUNCTIONS it forms a byte-identical prefix, so the LLM provider's
+# prompt cache can skip prefilling it; per-call context must go after it.
+SYSTEM_MESSAGE = MappingProxyType({"role": "system", "content": SYSTEM_PROMPT})
+
+# Fixed nudge appended after the transcript on reminder_required turns,
+# so the cached prefix is unchanged
+REMINDER_MESSAGE = MappingProxyType({
+    "role": "user",
+    "content": "(The user has been silent for a while. Check if they need any help or are still there.)",
+})
+
 BEGIN_MESSAGE = "Hello! Thank you for calling. This is the CrownDesk dental practice assistant. How can I help you today?"
 
 
@@ -317,6 +332,131 @@ AVAILABLE_FUNCTIONS = [
 ]
 
 
+# ============================================================================
+# Conversation State
+# ============================================================================
+
+class ConversationHistory:
+    """
+    LLM messages mirrored from the Retell transcript.
+
+    Retell resends the whole transcript on every event. Only utterances not
+    seen before are converted, so a turn costs O(new utterances) rather than
+    rebuilding the message list from the start of the call.
+    """
+
+    def __init__(self) -> None:
+        self.messages: List[Dict[str, Any]] = [dict(SYSTEM_MESSAGE)]
+        self._synced = 0
+        self._tail_appended = False
+        # Latest user utterance, for guardrail checks without a rescan
+        self.last_user_message: Optional[str] = None
+
+    def sync(self, transcript: List[Dict]) -> None:
+        """Bring messages up to date with the latest transcript."""
+        if len(transcript) < self._synced:
+            # Transcript restarted (e.g. reconnect); rebuild from scratch
+            del self.messages[1:]
+            self._synced = 0
+            self.last_user_message = None
+        elif self._synced:
+            # Retell rewrites the final utterance while the speaker is talking
+            if self._tail_appended:
+                self.messages.pop()
+            self._synced -= 1
+
+        for utterance in transcript[self._synced:]:
+            content = utterance.get("content", "")
+            speaker = utterance.get("role")
+            if speaker == "user":
+                self.last_user_message = content
+            self._tail_appended = bool(content)
+            if content:
+                role = "assistant" if speaker == "agent" else "user"
+                self.messages.append({"role": role, "content": content})
+        self._synced = len(transcript)
+
+
+async def receive_frame(websocket: WebSocket) -> Union[str, bytes]:
+    """
+    Receive the payload of the next frame, text or binary, as delivered.
+
+    orjson parses either type directly, so nothing is decoded or copied
+    here; receive_text would also reject binary frames outright.
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    text = message.get("text")
+    return text if text is not None else message["bytes"]
+
+
+# Largest frame accepted from Retell, in bytes. Full transcripts of long
+# calls stay well below this; keep in step with uvicorn's --ws-max-size
+MAX_FRAME_SIZE = 1024 * 1024
+
+
+def frame_size(data: Union[str, bytes]) -> int:
+    """Size of a frame payload in bytes, as counted by --ws-max-size."""
+    # A str is at most 4 UTF-8 bytes per character, so short text frames
+    # skip the encode
+    if isinstance(data, str) and len(data) * 4 > MAX_FRAME_SIZE:
+        return len(data.encode())
+    return len(data)
+
+
+async def pump_frames(websocket: WebSocket, frames: asyncio.Queue) -> None:
+    """
+    Queue incoming frames until the socket closes.
+
+    The exception that ends the connection is queued last, so the handler
+    loop sees it only after every frame received before it.
+    """
+    try:
+        while True:
+            data = await receive_frame(websocket)
+            size = frame_size(data)
+            if size > MAX_FRAME_SIZE:
+                # Dropped before it is queued or parsed
+                logger.warning("Dropping oversized Retell frame: %d bytes", size)
+                continue
+            frames.put_nowait(data)
+    except Exception as e:
+        frames.put_nowait(e)
+
+
+async def send_event(websocket: WebSocket, event: Dict[str, Any]) -> None:
+    """Send a Retell event as a JSON text frame, serialized with orjson."""
+    await websocket.send_text(orjson.dumps(event).decode())
+
+
+# Constant frames, serialized once at import
+CONFIG_FRAME = orjson.dumps({
+    "response_type": "config",
+    "config": {
+        "auto_reconnect": True,
+        "call_details": True,
+        "transcript_with_tool_calls": True
+    }
+}).decode()
+
+BEGIN_FRAME = orjson.dumps({
+    "response_type": "response",
+    "response_id": 0,
+    "content": BEGIN_MESSAGE,
+    "content_complete": True,
+    "end_call": False
+}).decode()
+
+# Error fallback, pre-encoded around its only varying field (response_id)
+ERROR_FRAME_PREFIX = '{"response_type":"response","response_id":'
+ERROR_FRAME_SUFFIX = "," + orjson.dumps({
+    "content": "I apologize, I'm having a bit of trouble. Would you like me to transfer you to our staff?",
+    "content_complete": True,
+    "end_call": False
+}).decode()[1:]
+
+
 # ============================================================================
 # WebSocket Endpoint for Retell AI Custom LLM
 # ============================================================================
@@ -340,123 +480,274 @@ async def retell_websocket(
     Protocol: https://docs.retellai.com/api-references/llm-websocket
     """
     await websocket.accept()
-    logger.info(f"Retell WebSocket connected: call_id={call_id}, tenant_id={tenant_id}")
+    logger.info("Retell WebSocket connected: call_id=%s, tenant_id=%s", call_id, tenant_id)
     
-    # Initialize services
-    settings = get_settings()
-    retell_service = RetellService(settings)
-    ai_orchestrator = AIOrchestrator(settings)
-    guardrails = HIPAAGuardrails()
+    # App-wide services, built once in the lifespan
+    state = websocket.app.state
+    services = CallServices(
+        ai_orchestrator=state.ai_orchestrator,
+        guardrails=state.guardrails,
+        retell_service=state.retell_service,
+    )
     
     # Call state
     call_state = {
         "call_id": call_id,
         "tenant_id": tenant_id,
-        "started_at": datetime.utcnow().isoformat(),
+        "started_at": time.time(),  # Epoch seconds; formatted only when persisted
         "patient_verified": False,
         "patient_id": None,
         "conversation_history": [],
+        "history": ConversationHistory(),
         "function_calls": [],
+        "tool_seq": 0,
         "last_response_id": 0
     }
     
+    # Frames are read by a separate task so bursts can be drained at once
+    frames: asyncio.Queue = asyncio.Queue()
+    reader = asyncio.create_task(pump_frames(websocket, frames))
+    pending: Optional[Union[str, bytes]] = None
+    
     try:
-        # Send initial config
-        config_event = {
-            "response_type": "config",
-            "config": {
-                "auto_reconnect": True,
-                "call_details": True,
-                "transcript_with_tool_calls": True
-            }
-        }
-        await websocket.send_json(config_event)
-        
-        # Send begin message
-        begin_response = {
-            "response_type": "response",
-            "response_id": 0,
-            "content": BEGIN_MESSAGE,
-            "content_complete": True,
-            "end_call": False
-        }
-        await websocket.send_json(begin_response)
+        # Send initial config and begin message
+        await websocket.send_text(CONFIG_FRAME)
+        await websocket.send_text(BEGIN_FRAME)
         
         # Main message loop
         while True:
             try:
-                data = await websocket.receive_text()
-                request_data = json.loads(data)
+                if pending is not None:
+                    data, pending = pending, None
+                else:
+                    data = await frames.get()
+                if isinstance(data, Exception):
+                    raise data
+
+                # Keep-alive pings are tiny and arrive every few seconds;
+                # answer them without parsing the frame
+                if (
+                    len(data) <= PING_FRAME_MAX_LEN
+                    and isinstance(data, str)
+                    and "ping_pong" in data
+                ):
+                    await _handle_ping_pong(websocket, call_state, None, services)
+                    continue
+
+                request_data = orjson.loads(data)
                 
-                interaction_type = request_data.get("interaction_type")
+                # Transcripts are cumulative, so of a queued run of
+                # update_only frames only the latest needs applying
+                while request_data.get("interaction_type") == "update_only" and not frames.empty():
+                    pending = frames.get_nowait()
+                    if not (isinstance(pending, str) and UPDATE_ONLY_MARKER in pending):
+                        break
+                    try:
+                        next_data = orjson.loads(pending)
+                    except orjson.JSONDecodeError as e:
+                        # Drop the bad frame and still apply the update in hand
+                        logger.error("Invalid JSON received: %s", e)
+                        pending = None
+                        break
+                    if next_data.get("interaction_type") != "update_only":
+                        break
+                    request_data, pending = next_data, None
                 
-                # Handle different event types
-                if interaction_type == "ping_pong":
-                    # Respond to keep-alive ping
-                    pong_response = {
-                        "response_type": "ping_pong",
-                        "timestamp": int(datetime.utcnow().timestamp() * 1000)
-                    }
-                    await websocket.send_json(pong_response)
-                    
-                elif interaction_type == "call_details":
-                    # Store call details
-                    call_state["call_details"] = request_data.get("call", {})
-                    logger.info(f"Call details received for {call_id}")
-                    
-                elif interaction_type == "update_only":
-                    # Process transcript update (no response needed)
-                    transcript = request_data.get("transcript", [])
-                    call_state["conversation_history"] = transcript
-                    
-                    # Check for turntaking
-                    turntaking = request_data.get("turntaking")
-                    if turntaking:
-                        logger.debug(f"Turn taking: {turntaking}")
-                    
-                elif interaction_type in ["response_required", "reminder_required"]:
-                    # Need to generate a response
-                    response_id = request_data.get("response_id", 0)
-                    transcript = request_data.get("transcript", [])
-                    call_state["conversation_history"] = transcript
-                    call_state["last_response_id"] = response_id
-                    
-                    # Generate response using AI orchestrator
-                    response = await generate_llm_response(
-                        ai_orchestrator=ai_orchestrator,
-                        guardrails=guardrails,
-                        retell_service=retell_service,
-                        websocket=websocket,
-                        call_state=call_state,
-                        transcript=transcript,
-                        response_id=response_id,
-                        is_reminder=(interaction_type == "reminder_required")
-                    )
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON received: {e}")
+                handler = INTERACTION_HANDLERS.get(
+                    request_data.get("interaction_type"), _handle_unknown
+                )
+                await handler(websocket, call_state, request_data, services)
+
+            except orjson.JSONDecodeError as e:
+                logger.error("Invalid JSON received: %s", e)
                 continue
                 
     except WebSocketDisconnect:
-        logger.info(f"Retell WebSocket disconnected: call_id={call_id}")
+        logger.info("Retell WebSocket disconnected: call_id=%s", call_id)
     except Exception as e:
-        logger.error(f"Error in Retell WebSocket: {e}", exc_info=True)
+        logger.error("Error in Retell WebSocket: %s", e, exc_info=True)
     finally:
+        reader.cancel()
+        
         # Log call completion
-        call_state["ended_at"] = datetime.utcnow().isoformat()
-        logger.info(f"Call ended: {call_id}, duration: {call_state.get('ended_at')}")
+        call_state["ended_at"] = time.time()
+        logger.info(
+            "Call ended: %s, duration: %.1fs",
+            call_id,
+            call_state["ended_at"] - call_state["started_at"],
+        )
         
         # Store call transcript (will be implemented in call storage service)
         # await store_call_transcript(call_state)
 
 
+# ============================================================================
+# Interaction Handlers
+# ============================================================================
+
+class CallServices(NamedTuple):
+    """Services used to answer a Retell call."""
+
+    ai_orchestrator: AIOrchestrator
+    guardrails: HIPAAGuardrails
+    retell_service: RetellService
+
+
+InteractionHandler = Callable[[WebSocket, Dict, Dict, CallServices], Awaitable[None]]
+
+# Pong frame pre-encoded around its only varying field
+PONG_PREFIX = '{"response_type":"ping_pong","timestamp":'
+PONG_SUFFIX = "}"
+
+# Cheap pre-check before parsing a queued frame to coalesce it
+UPDATE_ONLY_MARKER = '"update_only"'
+
+# Upper bound on a ping_pong frame; every other event carries far more
+PING_FRAME_MAX_LEN = 96
+
+
+async def _handle_ping_pong(
+    websocket: WebSocket, call_state: Dict, request_data: Optional[Dict], services: CallServices
+) -> None:
+    """Respond to keep-alive ping."""
+    await websocket.send_text(f"{PONG_PREFIX}{int(time.time() * 1000)}{PONG_SUFFIX}")
+
+
+async def _handle_call_details(
+    websocket: WebSocket, call_state: Dict, request_data: Dict, services: CallServices
+) -> None:
+    """Store call details."""
+    call_state["call_details"] = request_data.get("call", {})
+    logger.info("Call details received for %s", call_state['call_id'])
+
+
+async def _handle_update_only(
+    websocket: WebSocket, call_state: Dict, request_data: Dict, services: CallServices
+) -> None:
+    """Process transcript update (no response needed)."""
+    transcript = request_data.get("transcript", [])
+    call_state["conversation_history"] = transcript
+    call_state["history"].sync(transcript)
+
+    # Check for turntaking
+    turntaking = request_data.get("turntaking")
+    if turntaking:
+        logger.debug("Turn taking: %s", turntaking)
+
+
+async def _respond(
+    websocket: WebSocket,
+    call_state: Dict,
+    request_data: Dict,
+    services: CallServices,
+    is_reminder: bool,
+) -> None:
+    """Sync the transcript and generate a response for it."""
+    response_id = request_data.get("response_id", 0)
+    transcript = request_data.get("transcript", [])
+    call_state["conversation_history"] = transcript
+    call_state["history"].sync(transcript)
+    call_state["last_response_id"] = response_id
+
+    # Generate response using AI orchestrator
+    await generate_llm_response(
+        ai_orchestrator=services.ai_orchestrator,
+        guardrails=services.guardrails,
+        retell_service=services.retell_service,
+        websocket=websocket,
+        call_state=call_state,
+        response_id=response_id,
+        is_reminder=is_reminder,
+    )
+
+
+async def _handle_response_required(
+    websocket: WebSocket, call_state: Dict, request_data: Dict, services: CallServices
+) -> None:
+    """Generate a response to the caller's turn."""
+    await _respond(websocket, call_state, request_data, services, is_reminder=False)
+
+
+async def _handle_reminder_required(
+    websocket: WebSocket, call_state: Dict, request_data: Dict, services: CallServices
+) -> None:
+    """Check in with a caller who has gone quiet."""
+    await _respond(websocket, call_state, request_data, services, is_reminder=True)
+
+
+async def _handle_unknown(
+    websocket: WebSocket, call_state: Dict, request_data: Dict, services: CallServices
+) -> None:
+    """Ignore interaction types this server does not handle."""
+    logger.debug("Ignoring interaction type: %s", request_data.get('interaction_type'))
+
+
+# Streamed response flushing
+SENTENCE_ENDINGS = (".", "!", "?")
+RESPONSE_FLUSH_INTERVAL = 0.05  # seconds
+
+# Jump table for the receive loop, keyed by Retell interaction_type
+INTERACTION_HANDLERS: Dict[str, InteractionHandler] = {
+    "ping_pong": _handle_ping_pong,
+    "call_details": _handle_call_details,
+    "update_only": _handle_update_only,
+    "response_required": _handle_response_required,
+    "reminder_required": _handle_reminder_required,
+}
+
+
+async def stream_response(
+    websocket: WebSocket,
+    response_id: int,
+    events: AsyncGenerator[Dict[str, Any], None],
+) -> Optional[Dict[str, Any]]:
+    """
+    Relay streamed LLM content to Retell as partial responses.
+
+    Deltas are buffered and flushed at sentence ends or every
+    RESPONSE_FLUSH_INTERVAL seconds, whichever comes first, so speech can
+    start before generation finishes without a frame per token. Nothing
+    is marked complete here. Returns the function call, if the model
+    made one.
+    """
+    function_call = None
+    buffer: List[str] = []
+    last_flush = time.monotonic()
+
+    async def flush() -> None:
+        nonlocal last_flush
+        await send_event(websocket, {
+            "response_type": "response",
+            "response_id": response_id,
+            "content": "".join(buffer),
+            "content_complete": False,
+            "end_call": False
+        })
+        buffer.clear()
+        last_flush = time.monotonic()
+
+    async for event in events:
+        if event["type"] == "function_call":
+            function_call = event["function_call"]
+            continue
+        buffer.append(event["content"])
+        if (
+            event["content"].rstrip().endswith(SENTENCE_ENDINGS)
+            or time.monotonic() - last_flush >= RESPONSE_FLUSH_INTERVAL
+        ):
+            await flush()
+
+    if buffer:
+        await flush()
+    return function_call
+
+
 async def generate_llm_response(
     ai_orchestrator: AIOrchestrator,
     guardrails: HIPAAGuardrails,
     retell_service: RetellService,
     websocket: WebSocket,
     call_state: Dict,
-    transcript: List[Dict],
     response_id: int,
     is_reminder: bool = False
 ) -> None:
@@ -464,98 +755,88 @@ async def generate_llm_response(
     Generate LLM response for Retell AI.
     
     Handles:
-    - Converting transcript to LLM messages
+    - Building LLM messages from the call history
     - Applying HIPAA guardrails
     - Function calling
     - Streaming response back to Retell
     """
     try:
-        # Convert transcript to messages
-        messages = []
-        
-        # System prompt
-        messages.append({
-            "role": "system",
-            "content": SYSTEM_PROMPT
-        })
-        
-        # Add conversation history
-        for utterance in transcript:
-            role = "assistant" if utterance.get("role") == "agent" else "user"
-            content = utterance.get("content", "")
-            if content:
-                messages.append({
-                    "role": role,
-                    "content": content
-                })
+        # Conversation so far, static system prompt first. Passed by
+        # reference; per-turn additions go on a new list so they do not
+        # leak into the call history
+        messages = call_state["history"].messages
         
         # Add reminder prompt if needed
         if is_reminder:
-            messages.append({
-                "role": "user",
-                "content": "(The user has been silent for a while. Check if they need any help or are still there.)"
-            })
+            messages = [*messages, dict(REMINDER_MESSAGE)]
         
         # Check guardrails on the last user message
-        if transcript:
-            last_user_message = None
-            for utterance in reversed(transcript):
-                if utterance.get("role") == "user":
-                    last_user_message = utterance.get("content", "")
-                    break
-            
-            if last_user_message:
-                guardrail_check = guardrails.check_message(last_user_message)
-                if guardrail_check.get("blocked"):
-                    # Send guardrail response
-                    response = {
-                        "response_type": "response",
-                        "response_id": response_id,
-                        "content": guardrail_check.get("message", "I apologize, but I'm not able to help with that. Would you like to speak with our staff?"),
-                        "content_complete": True,
-                        "end_call": False
-                    }
-                    await websocket.send_json(response)
-                    return
+        last_user_message = call_state["history"].last_user_message
+        if last_user_message:
+            guardrail_check = guardrails.check_message(last_user_message)
+            if guardrail_check.get("blocked"):
+                # Send guardrail response
+                response = {
+                    "response_type": "response",
+                    "response_id": response_id,
+                    "content": guardrail_check.get("message", "I apologize, but I'm not able to help with that. Would you like to speak with our staff?"),
+                    "content_complete": True,
+                    "end_call": False
+                }
+                await send_event(websocket, response)
+                return
         
-        # Generate LLM response with function calling
-        llm_response = await ai_orchestrator.generate_voice_response(
-            messages=messages,
-            functions=AVAILABLE_FUNCTIONS,
-            tenant_id=call_state.get("tenant_id")
+        # Stream the LLM response with function calling
+        func_call = await stream_response(
+            websocket,
+            response_id,
+            ai_orchestrator.stream_voice_response(
+                messages=messages,
+                functions=AVAILABLE_FUNCTIONS,
+                tenant_id=call_state.get("tenant_id")
+            ),
         )
         
         # Handle function calls
-        if llm_response.get("function_call"):
-            func_call = llm_response["function_call"]
+        if func_call:
             func_name = func_call.get("name")
             func_args = func_call.get("arguments", {})
+            # Encode once; reuse the model's own argument text when available
+            args_json = func_call.get("raw_arguments") or (
+                orjson.dumps(func_args).decode() if isinstance(func_args, dict) else func_args
+            )
             
             # Send tool call invocation event
-            tool_call_id = str(uuid4())
+            # Only needs to be unique within this call
+            call_state["tool_seq"] += 1
+            tool_call_id = f"tc_{call_state['call_id']}_{call_state['tool_seq']}"
             invocation_event = {
                 "response_type": "tool_call_invocation",
                 "tool_call_id": tool_call_id,
                 "name": func_name,
-                "arguments": json.dumps(func_args) if isinstance(func_args, dict) else func_args
+                "arguments": args_json
             }
-            await websocket.send_json(invocation_event)
             
-            # Execute function
-            func_result = await execute_function(
-                func_name=func_name,
-                func_args=func_args,
-                call_state=call_state,
-                retell_service=retell_service
+            # Execute function while the invocation event is written out
+            _, func_result = await asyncio.gather(
+                send_event(websocket, invocation_event),
+                execute_function(
+                    func_name=func_name,
+                    func_args=func_args,
+                    call_state=call_state,
+                    retell_service=retell_service
+                ),
             )
             
+            result_json = orjson.dumps(func_result).decode() if isinstance(func_result, dict) else str(func_result)
+            
             # Send tool call result event
             result_event = {
                 "response_type": "tool_call_result",
                 "tool_call_id": tool_call_id,
-                "content": json.dumps(func_result) if isinstance(func_result, dict) else str(func_result)
+                "content": result_json
             }
-            await websocket.send_json(result_event)
+            await send_event(websocket, result_event)
             
             # Handle special functions
             if func_name == "end_call":
@@ -566,7 +847,7 @@ async def generate_llm_response(
                     "content_complete": True,
                     "end_call": True
                 }
-                await websocket.send_json(response)
+                await send_event(websocket, response)
                 return
                 
             elif func_name == "transfer_to_human":
@@ -580,71 +861,128 @@ async def generate_llm_response(
                     "end_call": False,
                     "transfer_number": transfer_number
                 }
-                await websocket.send_json(response)
+                await send_event(websocket, response)
                 return
             
             # For other functions, generate follow-up response
-            messages.append({
-                "role": "assistant",
-                "content": None,
-                "function_call": {
+            messages = [
+                *messages,
+                {
+                    "role": "assistant",
+                    "content": None,
+                    "function_call": {
+                        "name": func_name,
+                        "arguments": args_json
+                    }
+                },
+                {
+                    "role": "function",
                     "name": func_name,
-                    "arguments": json.dumps(func_args)
-                }
-            })
-            messages.append({
-                "role": "function",
-                "name": func_name,
-                "content": json.dumps(func_result)
-            })
+                    "content": result_json
+                },
+            ]
             
-            # Generate response based on function result
-            follow_up_response = await ai_orchestrator.generate_voice_response(
-                messages=messages,
-                functions=AVAILABLE_FUNCTIONS,
-                tenant_id=call_state.get("tenant_id")
+            # Stream response based on function result
+            await stream_response(
+                websocket,
+                response_id,
+                ai_orchestrator.stream_voice_response(
+                    messages=messages,
+                    functions=AVAILABLE_FUNCTIONS,
+                    tenant_id=call_state.get("tenant_id")
+                ),
             )
-            
-            content = follow_up_response.get("content", "")
-        else:
-            content = llm_response.get("content", "")
         
-        # Send response (streaming if content is long)
-        if len(content) > 100:
-            # Stream in chunks
-            chunks = [content[i:i+50] for i in range(0, len(content), 50)]
-            for i, chunk in enumerate(chunks):
-                is_last = (i == len(chunks) - 1)
-                response = {
-                    "response_type": "response",
-                    "response_id": response_id,
-                    "content": chunk,
-                    "content_complete": is_last,
-                    "end_call": False
-                }
-                await websocket.send_json(response)
-        else:
-            # Send complete response
-            response = {
-                "response_type": "response",
-                "response_id": response_id,
-                "content": content,
-                "content_complete": True,
-                "end_call": False
-            }
-            await websocket.send_json(response)
-            
-    except Exception as e:
-        logger.error(f"Error generating LLM response: {e}", exc_info=True)
-        # Send error fallback response
-        error_response = {
+        # Close the streamed response
+        response = {
             "response_type": "response",
             "response_id": response_id,
-            "content": "I apologize, I'm having a bit of trouble. Would you like me to transfer you to our staff?",
+            "content": "",
             "content_complete": True,
             "end_call": False
         }
-        await websocket.send_json(error_response)
+        await send_event(websocket, response)
+            
+    except Exception as e:
+        logger.error("Error generating LLM response: %s", e, exc_info=True)
+        # Send error fallback response
+        await websocket.send_text(f"{ERROR_FRAME_PREFIX}{response_id}{ERROR_FRAME_SUFFIX}")
+
+
+class BackendFunction(NamedTuple):
+    """How an LLM function call maps onto a RetellService method."""
+
+    method: Callable[..., Awaitable[Dict[str, Any]]]
+    args: Tuple[Tuple[str, str], ...]  # (method parameter, LLM argument name)
+    requires_verification: bool = False
+    verifies_patient: bool = False
+    cached: bool = False  # Read-only lookup, reusable for a short TTL
+    changes_schedule: bool = False  # Invalidates cached lookups
+
+
+# Function name -> backend call, built once at import
+BACKEND_FUNCTIONS: Dict[str, BackendFunction] = {
+    # Creates the appointment via the approval system
+    "book_appointment": BackendFunction(
+        RetellService.book_appointment,
+        (
+            ("patient_name", "patient_name"),
+            ("patient_dob", "patient_dob"),
+            ("appointment_type", "appointment_type"),
+            ("preferred_date", "preferred_date"),
+            ("preferred_time", "preferred_time"),
+            ("notes", "notes"),
+        ),
+        changes_schedule=True,
+    ),
+    "check_availability": BackendFunction(
+        RetellService.check_availability,
+        (("date", "date"), ("appointment_type", "appointment_type")),
+        cached=True,
+    ),
+    "reschedule_appointment": BackendFunction(
+        RetellService.reschedule_appointment,
+        (
+            ("patient_name", "patient_name"),
+            ("patient_dob", "patient_dob"),
+            ("current_date", "current_appointment_date"),
+            ("new_date", "new_preferred_date"),
+            ("new_time", "new_preferred_time"),
+        ),
+        changes_schedule=True,
+    ),
+    "cancel_appointment": BackendFunction(
+        RetellService.cancel_appointment,
+        (
+            ("patient_name", "patient_name"),
+            ("patient_dob", "patient_dob"),
+            ("appointment_date", "appointment_date"),
+            ("reason", "cancellation_reason"),
+        ),
+        changes_schedule=True,
+    ),
+    "lookup_patient": BackendFunction(
+        RetellService.lookup_patient,
+        (("patient_name", "patient_name"), ("patient_dob", "patient_dob")),
+        verifies_patient=True,
+        cached=True,
+    ),
+    "get_insurance_info": BackendFunction(
+        RetellService.get_insurance_info,
+        (
+            ("patient_name", "patient_name"),
+            ("patient_dob", "patient_dob"),
+            ("procedure_type", "procedure_type"),
+        ),
+        requires_verification=True,
+    ),
+}
+
+
+@lru_cache
+def get_lookup_cache() -> TTLCache:
+    """Short-lived cache of read-only backend lookups, shared by all calls."""
+    return TTLCache(maxsize=1024, ttl=get_settings().retell_lookup_cache_ttl)
 
 
 async def execute_function(
@@ -661,72 +999,41 @@ async def execute_function(
     tenant_id = call_state.get("tenant_id")
     
     try:
-        if func_name == "book_appointment":
-            # Call backend to create appointment (via approval system)
-            result = await retell_service.book_appointment(
-                tenant_id=tenant_id,
-                patient_name=func_args.get("patient_name"),
-                patient_dob=func_args.get("patient_dob"),
-                appointment_type=func_args.get("appointment_type"),
-                preferred_date=func_args.get("preferred_date"),
-                preferred_time=func_args.get("preferred_time"),
-                notes=func_args.get("notes")
-            )
-            return result
-            
-        elif func_name == "check_availability":
-            result = await retell_service.check_availability(
-                tenant_id=tenant_id,
-                date=func_args.get("date"),
-                appointment_type=func_args.get("appointment_type")
-            )
-            return result
-            
-        elif func_name == "reschedule_appointment":
-            result = await retell_service.reschedule_appointment(
-                tenant_id=tenant_id,
-                patient_name=func_args.get("patient_name"),
-                patient_dob=func_args.get("patient_dob"),
-                current_date=func_args.get("current_appointment_date"),
-                new_date=func_args.get("new_preferred_date"),
-                new_time=func_args.get("new_preferred_time")
-            )
-            return result
+        backend_function = BACKEND_FUNCTIONS.get(func_name)
+        if backend_function is not None:
+            if backend_function.requires_verification and not call_state.get("patient_verified"):
+                return {"error": "Patient identity not verified. Please verify the patient first."}
+            kwargs = {param: func_args.get(arg) for param, arg in backend_function.args}
             
-        elif func_name == "cancel_appointment":
-            result = await retell_service.cancel_appointment(
-                tenant_id=tenant_id,
-                patient_name=func_args.get("patient_name"),
-                patient_dob=func_args.get("patient_dob"),
-                appointment_date=func_args.get("appointment_date"),
-                reason=func_args.get("cancellation_reason")
-            )
-            return result
+            async def call_backend() -> Dict[str, Any]:
+                return await backend_function.method(retell_service, tenant_id=tenant_id, **kwargs)
             
-        elif func_name == "lookup_patient":
-            result = await retell_service.lookup_patient(
-                tenant_id=tenant_id,
-                patient_name=func_args.get("patient_name"),
-                patient_dob=func_args.get("patient_dob")
-            )
+            cache_key = (func_name, tenant_id, *kwargs.values())
+            if backend_function.verifies_patient and call_state.get("patient_lookup_key") == cache_key:
+                # Same identity already confirmed earlier in this call
+                return call_state["patient_record"]
+            if backend_function.cached:
+                # Callers often repeat a lookup after a reprompt
+                result = await get_lookup_cache().get_or_load(
+                    cache_key,
+                    call_backend,
+                    should_cache=lambda r: "error" not in r and (
+                        not backend_function.verifies_patient or bool(r.get("found"))
+                    ),
+                )
+            else:
+                result = await call_backend()
+                if backend_function.changes_schedule:
+                    get_lookup_cache().clear()
             # Mark patient as verified in call state
-            if result.get("found"):
+            if backend_function.verifies_patient and result.get("found"):
                 call_state["patient_verified"] = True
+                call_state["patient_lookup_key"] = cache_key
+                call_state["patient_record"] = result
                 call_state["patient_id"] = result.get("patient_id")
             return result
             
-        elif func_name == "get_insurance_info":
-            if not call_state.get("patient_verified"):
-                return {"error": "Patient identity not verified. Please verify the patient first."}
-            result = await retell_service.get_insurance_info(
-                tenant_id=tenant_id,
-                patient_name=func_args.get("patient_name"),
-                patient_dob=func_args.get("patient_dob"),
-                procedure_type=func_args.get("procedure_type")
-            )
-            return result
-            
-        elif func_name == "transfer_to_human":
+        if func_name == "transfer_to_human":
             # Log transfer request
             call_state["transfer_requested"] = True
             call_state["transfer_reason"] = func_args.get("reason")
@@ -737,11 +1044,11 @@ async def execute_function(
             return {"success": True, "message": "Call ended"}
             
         else:
-            logger.warning(f"Unknown function called: {func_name}")
+            logger.warning("Unknown function called: %s", func_name)
             return {"error": f"Unknown function: {func_name}"}
             
     except Exception as e:
-        logger.error(f"Error executing function {func_name}: {e}", exc_info=True)
+        logger.error("Error executing function %s: %s", func_name, e, exc_info=True)
         return {"error": str(e)}
 
 
@@ -768,15 +1075,15 @@ class AgentResponse(BaseModel):
 
 
 @router.post("/agents", response_model=AgentResponse)
-async def create_retell_agent(request: CreateAgentRequest):
+async def create_retell_agent(
+    request: CreateAgentRequest,
+    retell_service: RetellService = Depends(get_retell_service),
+):
     """
     Create a new Retell AI agent for a tenant.
     
     This creates an agent in Retell with our custom LLM WebSocket URL.
     """
-    settings = get_settings()
-    retell_service = RetellService(settings)
-    
     try:
         agent = await retell_service.create_agent(
             tenant_id=request.tenant_id,
@@ -787,21 +1094,21 @@ async def create_retell_agent(request: CreateAgentRequest):
         )
         return AgentResponse(**agent)
     except Exception as e:
-        logger.error(f"Error creating Retell agent: {e}")
+        logger.error("Error creating Retell agent: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/agents/{tenant_id}")
-async def get_tenant_agents(tenant_id: str):
+async def get_tenant_agents(
+    tenant_id: str,
+    retell_service: RetellService = Depends(get_retell_service),
+):
     """Get all Retell agents for a tenant."""
-    settings = get_settings()
-    retell_service = RetellService(settings)
-    
     try:
         agents = await retell_service.get_agents(tenant_id)
         return {"agents": agents}
     except Exception as e:
-        logger.error(f"Error getting agents: {e}")
+        logger.error("Error getting agents: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -815,8 +1122,29 @@ class RetellWebhookEvent(BaseModel):
     call: Dict
 
 
+# References to in-flight background writes, so they are not garbage
+# collected before finishing
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _on_background_task_done(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background task %s failed", task.get_name(), exc_info=task.exception())
+
+
+def run_in_background(coro: Awaitable[Any], name: str) -> None:
+    """Run a persistence coroutine without blocking the caller."""
+    task = asyncio.create_task(coro, name=name)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+
+
 @router.post("/webhook")
-async def retell_webhook(event: RetellWebhookEvent):
+async def retell_webhook(
+    event: RetellWebhookEvent,
+    retell_service: RetellService = Depends(get_retell_service),
+):
     """
     Handle webhook events from Retell AI.
     
@@ -825,26 +1153,26 @@ async def retell_webhook(event: RetellWebhookEvent):
     - call_ended: Call has ended
     - call_analyzed: Post-call analysis complete
     """
-    settings = get_settings()
-    retell_service = RetellService(settings)
-    
     try:
         if event.event == "call_started":
-            logger.info(f"Call started: {event.call.get('call_id')}")
+            logger.info("Call started: %s", event.call.get('call_id'))
             # Could create a call record here
             
         elif event.event == "call_ended":
-            logger.info(f"Call ended: {event.call.get('call_id')}")
-            # Store call transcript and metadata
-            await retell_service.store_call_record(event.call)
+            logger.info("Call ended: %s", event.call.get('call_id'))
+            # Store call transcript and metadata without holding the response
+            run_in_background(
+                retell_service.store_call_record(event.call),
+                name=f"store_call_record:{event.call.get('call_id')}",
+            )
             
         elif event.event == "call_analyzed":
-            logger.info(f"Call analyzed: {event.call.get('call_id')}")
+            logger.info("Call analyzed: %s", event.call.get('call_id'))
             # Store analysis results, trigger follow-up workflows
             await retell_service.process_call_analysis(event.call)
         
         return {"status": "ok"}
         
     except Exception as e:
-        logger.error(f"Error processing webhook: {e}")
+        logger.error("Error processing webhook: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -4,16 +4,24 @@ Handles media streams from Twilio, processes audio with STT, LLM, and ElevenLabs
 """
 
 import asyncio
-import base64
-import json
+import binascii
+import io
 import logging
-from typing import Any, Dict, Optional
+import re
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, AsyncGenerator, AsyncIterator, Deque, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse, Response
 import httpx
-import openai
+import orjson
 from pydantic import BaseModel
+from starlette.requests import HTTPConnection
+
+from ai_service.audio import is_speech, mulaw_to_wav
+from ai_service.clients import get_openai_client
+from ai_service.config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +35,14 @@ class TwilioConfig(BaseModel):
     phone_number: str
 
 
+# End-of-turn detection, in 20 ms frames / bytes of 8 kHz mu-law
+MIN_SPEECH_FRAMES = 10  # 200 ms of speech before a turn counts
+END_OF_TURN_SILENCE_FRAMES = 15  # 300 ms of trailing silence ends the turn
+MIN_UTTERANCE_BYTES = 3200  # 400 ms; anything shorter is noise
+MAX_UTTERANCE_BYTES = 8000 * 15  # Flush after 15 s even without a pause
+BACKFILL_FRAMES = 100  # Keep up to 2 s of speech heard during a reply
+
+
 class ConversationState:
     """Maintains state for an active voice conversation"""
     
@@ -45,17 +61,51 @@ class ConversationState:
         }
         self.current_field = "firstName"
         self.is_processing = False
+        # Caller audio heard while a turn is being answered (bounded)
+        self.backfill: Deque[bytes] = deque(maxlen=BACKFILL_FRAMES)
+        # Voice activity, counted in 20 ms Twilio frames
+        self.speech_frames = 0
+        self.trailing_silence_frames = 0
         
     def add_to_buffer(self, audio_chunk: bytes):
-        """Add audio chunk to buffer"""
+        """Add audio chunk to buffer, tracking speech for end-of-turn detection"""
+        if is_speech(audio_chunk):
+            self.speech_frames += 1
+            self.trailing_silence_frames = 0
+        elif self.speech_frames:
+            self.trailing_silence_frames += 1
+        else:
+            # Nothing said yet; leading silence is not worth transcribing
+            return
         self.audio_buffer.extend(audio_chunk)
         
-    def get_and_clear_buffer(self) -> bytes:
+    def utterance_complete(self) -> bool:
+        """Check if the caller spoke and has now paused long enough to end the turn"""
+        if len(self.audio_buffer) >= MAX_UTTERANCE_BYTES:
+            return True
+        if self.trailing_silence_frames < END_OF_TURN_SILENCE_FRAMES:
+            return False
+        if self.speech_frames < MIN_SPEECH_FRAMES or len(self.audio_buffer) < MIN_UTTERANCE_BYTES:
+            # Too short to be speech (a cough, line noise); discard it
+            self.get_and_clear_buffer()
+            return False
+        return True
+        
+    def get_and_clear_buffer(self) -> bytearray:
         """Get audio buffer and clear it"""
-        audio = bytes(self.audio_buffer)
-        self.audio_buffer.clear()
+        # Hand over the filled buffer and start a fresh one instead of
+        # copying it; the audio helpers read any bytes-like object
+        audio, self.audio_buffer = self.audio_buffer, bytearray()
+        self.speech_frames = 0
+        self.trailing_silence_frames = 0
         return audio
         
+    def finish_processing(self):
+        """Resume listening, starting from audio heard while the turn was answered"""
+        self.is_processing = False
+        while self.backfill:
+            self.add_to_buffer(self.backfill.popleft())
+        
     def add_message(self, role: str, content: str):
         """Add message to conversation history"""
         self.conversation_history.append({"role": role, "content": content})
@@ -65,7 +115,162 @@ class ConversationState:
         return all(self.collected_data.values())
 
 
-# Store active conversations
+# Fixed prompts, identical on every call
+GREETING = "Hi! Thank you for calling our dental office. I'm here to help you register as a new patient. May I have your first name, please?"
+COMPLETION_MESSAGE = "Perfect! I have all your information. You'll receive a text message shortly with a link to complete your registration. Thank you for calling!"
+
+# Synthesized prompts kept in memory (a few voices x fixed prompts)
+SPEECH_CACHE_SIZE = 32
+
+# System prompt for dental receptionist. Kept free of per-call state so it
+# is byte-identical on every request
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": """You are a friendly dental office receptionist helping a new patient register over the phone.
+
+Your goal is to collect the following information:
+1. First name
+2. Last name  
+3. Date of birth (format: MM/DD/YYYY)
+4. Phone number
+5. Email address
+6. Reason for visit
+
+Guidelines:
+- Be warm and conversational
+- Ask for one piece of information at a time
+- Confirm what you heard before moving to the next field
+- If you can't understand something, politely ask them to repeat
+- Whenever the caller gives any of these details, call update_patient with them
+- After collecting all info, thank them and tell them they'll receive a text shortly
+"""
+}
+
+# Earlier turns sent with each request; collected fields carry the rest
+HISTORY_MESSAGES = 8
+
+# Split point after a finished sentence in the streamed reply
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
+# Registration fields, in the order they are asked for
+PATIENT_FIELDS = ["firstName", "lastName", "dateOfBirth", "phone", "email", "reasonForVisit"]
+
+# Deterministic extraction of the registration fields
+PHONE_RE = re.compile(r"(?<!\d)(?:\+?1[\s.-]?)?\(?(\d{3})\)?[\s.-]?(\d{3})[\s.-]?(\d{4})(?!\d)")
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+DOB_NUMERIC_RE = re.compile(r"\b(\d{1,2})[/.\- ](\d{1,2})[/.\- ](\d{4})\b")
+DOB_SPOKEN_RE = re.compile(
+    r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})\b",
+    re.IGNORECASE
+)
+MONTHS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+# A name is only taken from an explicit cue; bare replies go to the model
+NAME_CUE_RE = re.compile(
+    r"^(?:(?:yes|yeah|sure|okay|ok|um|uh)[,.]?\s+)*"
+    r"(?:my (?:first |last )?name is|my name's|it's|it is|this is|call me)\s+",
+    re.IGNORECASE
+)
+NAME_RE = re.compile(r"^([A-Za-z][A-Za-z'\-]*)(?:\s+([A-Za-z][A-Za-z'\-]*))?[.!]?$")
+# Words that can follow a cue ("it's fine") but are not names
+NOT_NAMES = {
+    "yes", "yeah", "yep", "no", "nope", "sure", "okay", "ok", "hi", "hello", "sorry", "what",
+    "um", "uh", "fine", "good", "great", "me", "not", "just", "the", "a", "correct", "right",
+}
+
+
+def _format_dob(month: int, day: int, year: int) -> Optional[str]:
+    """MM/DD/YYYY if the parts form a real date"""
+    try:
+        return datetime(year, month, day).strftime("%m/%d/%Y")
+    except ValueError:
+        return None
+
+
+def _name_case(name: str) -> str:
+    """Capitalize the first letter, keeping the caller's casing elsewhere (McDonald)"""
+    return name[:1].upper() + name[1:]
+
+
+def extract_fields(user_input: str, current_field: str) -> Dict[str, str]:
+    """
+    Pull registration fields out of an utterance without calling the LLM.
+    
+    Phone numbers, emails and dates of birth are matched anywhere; names
+    only when the caller was asked for one and introduced it explicitly
+    ("my name is ...", "it's ...", "this is ...").
+    Anything the rules miss is left to the model's update_patient call.
+    """
+    fields: Dict[str, str] = {}
+    text = user_input.strip()
+    
+    email = EMAIL_RE.search(text)
+    if email:
+        fields["email"] = email.group(0).rstrip(".").lower()
+    
+    phone = PHONE_RE.search(text)
+    if phone:
+        fields["phone"] = "".join(phone.groups())
+    
+    dob = DOB_NUMERIC_RE.search(text)
+    if dob:
+        month, day, year = (int(part) for part in dob.groups())
+        formatted = _format_dob(month, day, year)
+    else:
+        dob = DOB_SPOKEN_RE.search(text)
+        formatted = dob and _format_dob(
+            MONTHS.index(dob.group(1).lower()) + 1, int(dob.group(2)), int(dob.group(3))
+        )
+    if formatted:
+        fields["dateOfBirth"] = formatted
+    
+    if current_field in ("firstName", "lastName") and not fields:
+        cue = NAME_CUE_RE.match(text)
+        name = cue and NAME_RE.match(text[cue.end():])
+        if name and not NOT_NAMES.intersection(part.lower() for part in name.groups() if part):
+            first, last = name.groups()
+            if current_field == "lastName":
+                fields["lastName"] = _name_case(last or first)
+            else:
+                fields["firstName"] = _name_case(first)
+                if last:
+                    fields["lastName"] = _name_case(last)
+    
+    return fields
+
+
+# Follow-up question when the model replies with only a tool call
+FIELD_QUESTIONS = {
+    "firstName": "May I have your first name, please?",
+    "lastName": "And what is your last name?",
+    "dateOfBirth": "What is your date of birth?",
+    "phone": "What is the best phone number to reach you?",
+    "email": "What is your email address?",
+    "reasonForVisit": "And what is the reason for your visit?",
+}
+
+# Lets the reply call also report the details the caller just gave
+UPDATE_PATIENT_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "update_patient",
+        "description": "Record registration details the caller has just provided. Only include fields they actually stated.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "firstName": {"type": "string", "description": "Patient's first name"},
+                "lastName": {"type": "string", "description": "Patient's last name"},
+                "dateOfBirth": {"type": "string", "description": "Date of birth as MM/DD/YYYY"},
+                "phone": {"type": "string", "description": "Phone number, digits only"},
+                "email": {"type": "string", "description": "Email address"},
+                "reasonForVisit": {"type": "string", "description": "Reason for the visit"}
+            }
+        }
+    }
+}
+
+
+# Store active conversations. Only touched from the event loop and never
+# across an await, so a plain dict needs no locking
 active_conversations: Dict[str, ConversationState] = {}
 
 
@@ -73,20 +278,29 @@ class VoiceAgentService:
     """Service for handling voice agent logic"""
     
     def __init__(self):
-        self.openai_client = openai.AsyncOpenAI()
+        self.openai_client = get_openai_client()
+        # Shared across turns and calls so ElevenLabs and backend requests
+        # reuse open keepalive connections instead of a new TLS handshake
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=32, keepalive_expiry=60.0),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
         self.elevenlabs_api_key = None  # Will be set from env
         self.elevenlabs_voice_id = "EXAVITQu4vr4xnSDxMaL"  # Sarah voice
+        # Bounds TTS streams across all calls; ElevenLabs rejects requests
+        # beyond the plan's concurrency limit
+        self._tts_semaphore = asyncio.Semaphore(get_settings().elevenlabs_concurrency)
+        # Synthesized audio for fixed prompts, keyed by (voice_id, text)
+        self._speech_cache: "OrderedDict[Tuple[str, str], List[bytes]]" = OrderedDict()
         
     async def transcribe_audio(self, audio_data: bytes, format: str = "mulaw") -> str:
         """Transcribe audio using OpenAI Whisper"""
         try:
-            # Convert mulaw to wav if needed
-            # For now, assume direct transcription
             logger.info(f"Transcribing audio: {len(audio_data)} bytes")
             
-            # Create a temporary file-like object
-            import io
-            audio_file = io.BytesIO(audio_data)
+            # Twilio sends headerless mu-law; decode it into a real WAV file
+            # so Whisper does not have to guess the encoding
+            audio_file = io.BytesIO(mulaw_to_wav(audio_data) if format == "mulaw" else audio_data)
             audio_file.name = "audio.wav"
             
             # Use OpenAI Whisper
@@ -107,138 +321,185 @@ class VoiceAgentService:
         self, 
         user_input: str, 
         state: ConversationState
-    ) -> str:
-        """Process user input with LLM to extract information and generate response"""
+    ) -> AsyncGenerator[str, None]:
+        """
+        Process user input with LLM to extract information and generate response.
         
-        # System prompt for dental receptionist
-        system_prompt = """You are a friendly dental office receptionist helping a new patient register over the phone.
-
-Your goal is to collect the following information:
-1. First name
-2. Last name  
-3. Date of birth (format: MM/DD/YYYY)
-4. Phone number
-5. Email address
-6. Reason for visit
-
-Guidelines:
-- Be warm and conversational
-- Ask for one piece of information at a time
-- Confirm what you heard before moving to the next field
-- If you can't understand something, politely ask them to repeat
-- After collecting all info, thank them and tell them they'll receive a text shortly
-
-Current collected data: {collected_data}
-Currently asking for: {current_field}
-""".format(
-            collected_data=json.dumps(state.collected_data, indent=2),
-            current_field=state.current_field
-        )
+        The reply is streamed and yielded one sentence at a time, so speech
+        synthesis can start before the model has finished the whole reply.
+        """
+        
+        # Well-formed answers are recorded by rule first, so the prompt below
+        # already shows them and the model moves on to the next question
+        rule_fields = extract_fields(user_input, state.current_field)
+        if rule_fields:
+            self._apply_patient_update(rule_fields, state)
         
         # Add user input to history
         state.add_message("user", user_input)
         
-        # Build messages for LLM
-        messages = [
-            {"role": "system", "content": system_prompt}
-        ] + state.conversation_history
+        # Build messages for LLM: the unchanging prompt first so the
+        # provider can reuse its cached prefix, then recent turns, with the
+        # registration progress just before the caller's latest words
+        progress = {
+            "role": "system",
+            "content": f"Collected so far: {orjson.dumps(state.collected_data).decode()}. Currently asking for: {state.current_field}"
+        }
+        recent = state.conversation_history[-(HISTORY_MESSAGES + 1):]
+        messages = [SYSTEM_MESSAGE, *recent[:-1], progress, recent[-1]]
+        
+        reply_parts: List[str] = []
+        tool_arguments: List[str] = []
+        unsent = ""
         
         try:
-            # Call OpenAI
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4-turbo-preview",
+            # One call both replies and reports any details the caller gave
+            stream = await self.openai_client.chat.completions.create(
+                model="gpt-4o-mini",
                 messages=messages,
+                tools=[UPDATE_PATIENT_TOOL],
+                tool_choice="auto",
                 temperature=0.7,
-                max_tokens=150
+                max_tokens=150,
+                stream=True
             )
             
-            assistant_response = response.choices[0].message.content
-            state.add_message("assistant", assistant_response)
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                for tool_call in delta.tool_calls or ():
+                    if tool_call.index == 0 and tool_call.function and tool_call.function.arguments:
+                        tool_arguments.append(tool_call.function.arguments)
+                if delta.content:
+                    reply_parts.append(delta.content)
+                    # Hand off every finished sentence; keep the partial one
+                    *sentences, unsent = SENTENCE_BREAK.split(unsent + delta.content)
+                    for sentence in sentences:
+                        yield sentence
+            
+            if tool_arguments:
+                try:
+                    self._apply_patient_update(orjson.loads("".join(tool_arguments)), state)
+                except orjson.JSONDecodeError as e:
+                    logger.error(f"Data extraction error: {e}")
+            
+            # The model may answer with only the tool call
+            if not reply_parts:
+                unsent = (
+                    f"Thank you! {FIELD_QUESTIONS[state.current_field]}"
+                    if not state.is_complete() else "Thank you!"
+                )
+            if unsent.strip():
+                yield unsent
             
-            # Extract data from user input
-            await self._extract_data(user_input, state)
+            assistant_response = "".join(reply_parts) or unsent
+            state.add_message("assistant", assistant_response)
             
             logger.info(f"LLM Response: {assistant_response}")
             logger.info(f"Collected data: {state.collected_data}")
             
-            return assistant_response
-            
         except Exception as e:
             logger.error(f"LLM processing error: {e}")
-            return "I'm sorry, I didn't catch that. Could you please repeat?"
+            yield "I'm sorry, I didn't catch that. Could you please repeat?"
             
-    async def _extract_data(self, user_input: str, state: ConversationState):
-        """Extract structured data from user input"""
+    def _apply_patient_update(self, update: Dict[str, Any], state: ConversationState):
+        """Merge extracted fields into the collected data"""
         
-        # Use function calling to extract data
-        extraction_prompt = f"""Extract the {state.current_field} from this user response: "{user_input}"
+        for field, value in update.items():
+            if field in state.collected_data and value:
+                state.collected_data[field] = str(value).strip()
+                
+        # Ask next for the first field still missing
+        state.current_field = next(
+            (field for field in PATIENT_FIELDS if not state.collected_data[field]),
+            state.current_field
+        )
+            
+    async def _stream_speech(self, text: str) -> AsyncGenerator[bytes, None]:
+        """Stream ElevenLabs audio for text, raising if synthesis fails or is cut short"""
         
-Return ONLY the extracted value, or null if not found.
-Examples:
-- If current_field is "firstName" and user says "My name is John Smith", return "John"
-- If current_field is "dateOfBirth" and user says "March 15th 1985", return "03/15/1985"
-- If current_field is "phone" and user says "555-1234", return "5551234"
-"""
+        if not self.elevenlabs_api_key:
+            raise RuntimeError("ElevenLabs API key not configured")
+            
+        url = f"https://api.elevenlabs.io/v1/text-to-speech/{self.elevenlabs_voice_id}/stream"
         
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[{"role": "user", "content": extraction_prompt}],
-                temperature=0
-            )
+        headers = {
+            "Content-Type": "application/json",
+            "xi-api-key": self.elevenlabs_api_key
+        }
+        
+        data = {
+            "text": text,
+            "model_id": "eleven_monolingual_v1",
+            "voice_settings": {
+                "stability": 0.5,
+                "similarity_boost": 0.5
+            }
+        }
+        
+        async with self._tts_semaphore, self._http_client.stream(
+            "POST",
+            url,
+            # Twilio plays 8 kHz mu-law, so have ElevenLabs produce it
+            # directly instead of MP3
+            params={"optimize_streaming_latency": 3, "output_format": "ulaw_8000"},
+            json=data,
+            headers=headers
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise RuntimeError(f"ElevenLabs error: {response.status_code} - {response.text}")
             
-            extracted_value = response.choices[0].message.content.strip()
+            total_bytes = 0
+            async for chunk in response.aiter_bytes(4096):
+                total_bytes += len(chunk)
+                yield chunk
+            logger.info(f"Generated {total_bytes} bytes of audio")
             
-            if extracted_value and extracted_value.lower() != "null":
-                state.collected_data[state.current_field] = extracted_value
-                
-                # Move to next field
-                fields = ["firstName", "lastName", "dateOfBirth", "phone", "email", "reasonForVisit"]
-                current_idx = fields.index(state.current_field)
-                if current_idx < len(fields) - 1:
-                    state.current_field = fields[current_idx + 1]
-                    
+    async def text_to_speech(self, text: str) -> AsyncGenerator[bytes, None]:
+        """Convert text to speech using ElevenLabs, yielding 8 kHz mu-law audio as it is synthesized"""
+        
+        try:
+            async for chunk in self._stream_speech(text):
+                yield chunk
         except Exception as e:
-            logger.error(f"Data extraction error: {e}")
+            logger.error(f"TTS error: {e}")
             
-    async def text_to_speech(self, text: str) -> bytes:
-        """Convert text to speech using ElevenLabs"""
+    async def cached_speech(self, text: str) -> AsyncGenerator[bytes, None]:
+        """Like text_to_speech, but replays audio already synthesized for this voice and text"""
         
-        if not self.elevenlabs_api_key:
-            logger.error("ElevenLabs API key not configured")
-            return b""
+        key = (self.elevenlabs_voice_id, text)
+        chunks = self._speech_cache.get(key)
+        if chunks is not None:
+            self._speech_cache.move_to_end(key)
+            for chunk in chunks:
+                yield chunk
+            return
             
+        chunks = []
         try:
-            url = f"https://api.elevenlabs.io/v1/text-to-speech/{self.elevenlabs_voice_id}"
-            
-            headers = {
-                "Accept": "audio/mpeg",
-                "Content-Type": "application/json",
-                "xi-api-key": self.elevenlabs_api_key
-            }
-            
-            data = {
-                "text": text,
-                "model_id": "eleven_monolingual_v1",
-                "voice_settings": {
-                    "stability": 0.5,
-                    "similarity_boost": 0.5
-                }
-            }
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=data, headers=headers, timeout=30.0)
-                
-                if response.status_code == 200:
-                    logger.info(f"Generated {len(response.content)} bytes of audio")
-                    return response.content
-                else:
-                    logger.error(f"ElevenLabs error: {response.status_code} - {response.text}")
-                    return b""
-                    
+            async for chunk in self._stream_speech(text):
+                chunks.append(chunk)
+                yield chunk
         except Exception as e:
+            # Audio cut short by an error is still played, but never cached
             logger.error(f"TTS error: {e}")
-            return b""
+            return
+        if chunks:
+            self._speech_cache[key] = chunks
+            if len(self._speech_cache) > SPEECH_CACHE_SIZE:
+                self._speech_cache.popitem(last=False)
+            
+    async def warm_speech_cache(self):
+        """Synthesize the fixed call prompts ahead of the first call"""
+        for text in (GREETING, COMPLETION_MESSAGE):
+            async for _ in self.cached_speech(text):
+                pass
+            
+    async def close(self):
+        """Close the shared HTTP client on shutdown"""
+        await self._http_client.aclose()
             
     async def create_registration_and_send_sms(self, state: ConversationState):
         """Create registration token and send SMS via backend"""
@@ -247,36 +508,153 @@ Examples:
             # Call backend to create registration
             backend_url = "http://localhost:4000/api/registration/voice-intake"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    backend_url,
-                    json={
-                        "firstName": state.collected_data["firstName"],
-                        "lastName": state.collected_data["lastName"],
-                        "dateOfBirth": state.collected_data["dateOfBirth"],
-                        "phone": state.collected_data["phone"],
-                        "email": state.collected_data["email"],
-                        "reasonForVisit": state.collected_data["reasonForVisit"],
-                        "callSid": state.call_sid
-                    },
-                    timeout=10.0
-                )
+            response = await self._http_client.post(
+                backend_url,
+                json={
+                    "firstName": state.collected_data["firstName"],
+                    "lastName": state.collected_data["lastName"],
+                    "dateOfBirth": state.collected_data["dateOfBirth"],
+                    "phone": state.collected_data["phone"],
+                    "email": state.collected_data["email"],
+                    "reasonForVisit": state.collected_data["reasonForVisit"],
+                    "callSid": state.call_sid
+                },
+                timeout=10.0
+            )
+            
+            if response.status_code in [200, 201]:
+                logger.info(f"Registration created: {response.json()}")
+            else:
+                logger.error(f"Backend error: {response.status_code} - {response.text}")
                 
-                if response.status_code in [200, 201]:
-                    logger.info(f"Registration created: {response.json()}")
-                else:
-                    logger.error(f"Backend error: {response.status_code} - {response.text}")
-                    
         except Exception as e:
             logger.error(f"Registration creation error: {e}")
 
 
-# Global service instance
-voice_service = VoiceAgentService()
+def get_voice_service(connection: HTTPConnection) -> VoiceAgentService:
+    """Dependency injection for the voice agent service (app-wide singleton)"""
+    return connection.app.state.voice_service
+
+
+async def send_event(websocket: WebSocket, event: Dict[str, Any]) -> None:
+    """Send a Twilio message as a JSON text frame, serialized with orjson"""
+    await websocket.send_text(orjson.dumps(event).decode())
+
+
+def media_frame(stream_sid: str, audio: bytes) -> Dict[str, Any]:
+    """Twilio media message carrying one chunk of audio"""
+    return {
+        "event": "media",
+        "streamSid": stream_sid,
+        "media": {
+            # Chunks are at most a few KiB, so encoding inline is cheaper
+            # than a hop to a worker thread
+            "payload": binascii.b2a_base64(audio, newline=False).decode('ascii')
+        }
+    }
+
+
+async def send_speech(
+    websocket: WebSocket,
+    service: VoiceAgentService,
+    stream_sid: str,
+    text: str
+) -> None:
+    """Speak a fixed prompt to Twilio, from the speech cache when already synthesized"""
+    async for chunk in service.cached_speech(text):
+        await send_event(websocket, media_frame(stream_sid, chunk))
+
+
+async def _synthesize(service: VoiceAgentService, text: str, chunks: asyncio.Queue) -> None:
+    """Queue the audio for one sentence, ending with None"""
+    try:
+        async for chunk in service.text_to_speech(text):
+            chunks.put_nowait(chunk)
+    finally:
+        chunks.put_nowait(None)
+
+
+async def speak_stream(
+    websocket: WebSocket,
+    service: VoiceAgentService,
+    stream_sid: str,
+    sentences: AsyncIterator[str]
+) -> None:
+    """
+    Speak sentences to Twilio as the LLM produces them.
+    
+    Each sentence is synthesized as soon as it is complete and a TTS slot
+    is free, while earlier sentences are still being generated or sent. A
+    single sender forwards the audio sentence by sentence so Twilio
+    receives it in order.
+    """
+    # One chunk queue per sentence, in speaking order; None ends the reply
+    sentence_audio: asyncio.Queue = asyncio.Queue()
+    
+    async def send_in_order() -> None:
+        while (chunks := await sentence_audio.get()) is not None:
+            while (chunk := await chunks.get()) is not None:
+                await send_event(websocket, media_frame(stream_sid, chunk))
+    
+    sender = asyncio.create_task(send_in_order())
+    synthesizers = []
+    try:
+        async for sentence in sentences:
+            chunks: asyncio.Queue = asyncio.Queue()
+            synthesizers.append(asyncio.create_task(_synthesize(service, sentence, chunks)))
+            sentence_audio.put_nowait(chunks)
+        sentence_audio.put_nowait(None)
+        await sender
+    finally:
+        sender.cancel()
+        for task in synthesizers:
+            task.cancel()
+
+
+async def handle_turn(
+    websocket: WebSocket,
+    service: VoiceAgentService,
+    conversation: ConversationState
+) -> None:
+    """Transcribe the caller's finished utterance and speak the reply"""
+    stream_sid = conversation.stream_sid
+    try:
+        # Get audio from buffer
+        audio_to_process = conversation.get_and_clear_buffer()
+        
+        # Transcribe
+        transcript = await service.transcribe_audio(audio_to_process)
+        
+        if transcript:
+            # Process with LLM, speaking each sentence as it is generated
+            await speak_stream(
+                websocket,
+                service,
+                stream_sid,
+                service.process_with_llm(transcript, conversation)
+            )
+                
+            # Check if registration is complete
+            if conversation.is_complete():
+                # Create registration and send SMS while the completion
+                # message plays; neither waits on the other
+                await asyncio.gather(
+                    service.create_registration_and_send_sms(conversation),
+                    send_speech(websocket, service, stream_sid, COMPLETION_MESSAGE),
+                )
+                
+    except Exception as e:
+        logger.error(f"Turn processing error: {e}", exc_info=True)
+        
+    finally:
+        conversation.finish_processing()
 
 
 @router.websocket("/stream")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    voice_service: VoiceAgentService = Depends(get_voice_service),
+):
     """
     WebSocket endpoint for Twilio Media Streams
     Receives audio from Twilio, processes it, and returns audio responses
@@ -287,12 +665,13 @@ async def websocket_endpoint(websocket: WebSocket):
     call_sid: Optional[str] = None
     stream_sid: Optional[str] = None
     conversation: Optional[ConversationState] = None
+    turn_task: Optional[asyncio.Task] = None
     
     try:
         while True:
             # Receive message from Twilio
             message = await websocket.receive_text()
-            data = json.loads(message)
+            data = orjson.loads(message)
             
             event_type = data.get("event")
             
@@ -307,109 +686,52 @@ async def websocket_endpoint(websocket: WebSocket):
                 logger.info(f"Stream started: {stream_sid} for call {call_sid}")
                 
                 # Send initial greeting
-                greeting = "Hi! Thank you for calling our dental office. I'm here to help you register as a new patient. May I have your first name, please?"
-                
-                # Generate audio
-                audio_data = await voice_service.text_to_speech(greeting)
-                
-                if audio_data:
-                    # Convert to mulaw and send to Twilio
-                    audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-                    
-                    await websocket.send_json({
-                        "event": "media",
-                        "streamSid": stream_sid,
-                        "media": {
-                            "payload": audio_base64
-                        }
-                    })
+                await send_speech(websocket, voice_service, stream_sid, GREETING)
                     
             elif event_type == "media":
                 # Audio data received
-                if conversation and not conversation.is_processing:
+                if conversation:
                     payload = data["media"]["payload"]
-                    audio_chunk = base64.b64decode(payload)
+                    # Twilio payloads are well-formed; skip b64decode's argument checks
+                    audio_chunk = binascii.a2b_base64(payload)
+                    
+                    if conversation.is_processing:
+                        # Hold on to it for the next turn rather than dropping it
+                        conversation.backfill.append(audio_chunk)
+                        continue
                     
                     conversation.add_to_buffer(audio_chunk)
                     
-                    # Process when buffer reaches threshold (e.g., 3 seconds)
-                    if len(conversation.audio_buffer) > 48000:  # ~3 seconds at 16kHz
+                    # Process as soon as the caller stops talking. The turn
+                    # runs as a task so frames keep being read meanwhile
+                    if conversation.utterance_complete():
                         conversation.is_processing = True
-                        
-                        # Get audio from buffer
-                        audio_to_process = conversation.get_and_clear_buffer()
-                        
-                        # Transcribe
-                        transcript = await voice_service.transcribe_audio(audio_to_process)
-                        
-                        if transcript:
-                            # Process with LLM
-                            response_text = await voice_service.process_with_llm(
-                                transcript, 
-                                conversation
-                            )
-                            
-                            # Convert to speech
-                            audio_data = await voice_service.text_to_speech(response_text)
-                            
-                            if audio_data:
-                                audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-                                
-                                await websocket.send_json({
-                                    "event": "media",
-                                    "streamSid": stream_sid,
-                                    "media": {
-                                        "payload": audio_base64
-                                    }
-                                })
-                                
-                            # Check if registration is complete
-                            if conversation.is_complete():
-                                # Create registration and send SMS
-                                await voice_service.create_registration_and_send_sms(conversation)
-                                
-                                # Send completion message
-                                completion_text = "Perfect! I have all your information. You'll receive a text message shortly with a link to complete your registration. Thank you for calling!"
-                                
-                                audio_data = await voice_service.text_to_speech(completion_text)
-                                
-                                if audio_data:
-                                    audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-                                    
-                                    await websocket.send_json({
-                                        "event": "media",
-                                        "streamSid": stream_sid,
-                                        "media": {
-                                            "payload": audio_base64
-                                        }
-                                    })
-                                    
-                        conversation.is_processing = False
+                        turn_task = asyncio.create_task(
+                            handle_turn(websocket, voice_service, conversation)
+                        )
                         
             elif event_type == "stop":
                 # Stream stopped
                 logger.info(f"Stream stopped: {stream_sid}")
-                
-                if stream_sid in active_conversations:
-                    del active_conversations[stream_sid]
-                    
                 break
                 
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
-        
-        if stream_sid and stream_sid in active_conversations:
-            del active_conversations[stream_sid]
             
     except Exception as e:
         logger.error(f"WebSocket error: {e}", exc_info=True)
         
-        if stream_sid and stream_sid in active_conversations:
-            del active_conversations[stream_sid]
+    finally:
+        if turn_task:
+            turn_task.cancel()
+        
+        # However the stream ends, forget its conversation
+        if stream_sid:
+            active_conversations.pop(stream_sid, None)
 
 
 @router.get("/health")
-async def health_check():
+async def health_check(voice_service: VoiceAgentService = Depends(get_voice_service)):
     """Health check endpoint"""
     return {
         "status": "healthy",
@@ -419,7 +741,10 @@ async def health_check():
 
 
 @router.post("/configure")
-async def configure_service(config: dict):
+async def configure_service(
+    config: dict,
+    voice_service: VoiceAgentService = Depends(get_voice_service),
+):
     """Configure service with API keys"""
     
     if "elevenlabs_api_key" in config:
@@ -428,4 +753,7 @@ async def configure_service(config: dict):
     if "elevenlabs_voice_id" in config:
         voice_service.elevenlabs_voice_id = config["elevenlabs_voice_id"]
         
+    # Have the greeting ready before the first call with this voice
+    await voice_service.warm_speech_cache()
+        
     return {"status": "configured"}
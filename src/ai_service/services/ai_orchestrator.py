@@ -9,18 +9,118 @@ Unified AI orchestrator for:
 - Response generation with streaming
 """
 
-import json
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, AsyncGenerator
+import time
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
+import orjson
 from openai import AsyncOpenAI
 from anthropic import AsyncAnthropic
 
+from ai_service.cache import get_llm_cache, llm_cache_key, normalized_text
+from ai_service.clients import (
+    get_anthropic_client,
+    get_embedding_semaphore,
+    get_llm_semaphore,
+    get_openai_client,
+)
 from ai_service.config import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
+# Texts per embeddings request, as in RAGService
+EMBEDDING_BATCH_SIZE = 96
+
+# Longest a streamed delta waits in a batch before being sent
+STREAM_FLUSH_INTERVAL = 0.03
+
+
+class DeltaBatcher:
+    """
+    Coalesces streamed text deltas into fewer, larger chunks.
+
+    The first batch holds ``min_batch`` deltas so time to first token is
+    unchanged; each flush then multiplies the batch size by ``growth`` up
+    to ``max_batch``. A batch is also flushed once it is older than
+    ``flush_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        min_batch: int = 1,
+        max_batch: int = 32,
+        growth: int = 3,
+        flush_interval: float = STREAM_FLUSH_INTERVAL,
+    ):
+        self.max_batch = max_batch
+        self.growth = growth
+        self.flush_interval = flush_interval
+        self._batch_size = min_batch
+        self._buffer: List[str] = []
+        self._started_at = 0.0
+
+    def add(self, delta: str) -> Optional[str]:
+        """Buffer a delta, returning the joined batch when it is due."""
+        if not self._buffer:
+            self._started_at = time.monotonic()
+        self._buffer.append(delta)
+        if (
+            len(self._buffer) >= self._batch_size
+            or time.monotonic() - self._started_at >= self.flush_interval
+        ):
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is buffered and grow the next batch."""
+        if not self._buffer:
+            return None
+        text = "".join(self._buffer)
+        self._buffer = []
+        self._batch_size = min(self.max_batch, self._batch_size * self.growth)
+        return text
+
+
+@lru_cache(maxsize=64)
+def _render_intent_prompt(intents_key: Tuple[Tuple[str, str], ...]) -> str:
+    """Intent classifier system prompt, rendered once per set of intents."""
+    intent_descriptions = "\n".join(
+        f"- {name}: {description}" for name, description in intents_key
+    )
+    return f"""You are an intent classifier for a dental practice. 
+Classify the user's message into one of these intents:
+
+{intent_descriptions}
+
+Respond with JSON containing:
+- intent: the classified intent name
+- confidence: confidence score 0-1
+- entities: extracted entities (dates, names, procedures, etc.)
+"""
+
+
+# Strong references to fire-and-forget cleanup tasks
+_background_tasks: Set[asyncio.Task] = set()
+
+
+async def _discard_results(
+    tasks: List[asyncio.Future],
+    discard: Callable[[Any], Awaitable[None]],
+) -> None:
+    """Hand results of cancelled hedge attempts that had already succeeded to discard."""
+    for task in tasks:
+        try:
+            result = await task
+        except (Exception, asyncio.CancelledError):
+            continue
+        try:
+            await discard(result)
+        except Exception as e:
+            logger.warning("Failed to discard hedged result: %s", e)
+
 
 class AIOrchestrator:
     """
@@ -33,12 +133,18 @@ class AIOrchestrator:
     - Applies guardrails and safety checks
     """
     
-    def __init__(self, settings: Optional[Settings] = None):
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        stream_min_batch: int = 1,
+        stream_max_batch: int = 32,
+        stream_batch_growth: int = 3,
+    ):
         self.settings = settings or get_settings()
         
         # Initialize LLM clients
-        self._openai_client = None
-        self._anthropic_client = None
+        self._openai_client: Optional[AsyncOpenAI] = None
+        self._anthropic_client: Optional[AsyncAnthropic] = None
         
         # Default models
         self.default_model = "gpt-4-turbo-preview"
@@ -48,25 +154,94 @@ class AIOrchestrator:
         # Context settings
         self.max_context_tokens = 8000
         self.max_response_tokens = 1000
+        
+        # Streamed delta batching (see DeltaBatcher)
+        self.stream_min_batch = stream_min_batch
+        self.stream_max_batch = stream_max_batch
+        self.stream_batch_growth = stream_batch_growth
     
     @property
     def openai_client(self) -> AsyncOpenAI:
-        """Lazy initialization of OpenAI client."""
+        """Shared OpenAI client, resolved on first use."""
         if self._openai_client is None:
-            if not self.settings.openai_api_key:
-                raise ValueError("OpenAI API key not configured")
-            self._openai_client = AsyncOpenAI(api_key=self.settings.openai_api_key)
+            self._openai_client = get_openai_client()
         return self._openai_client
     
     @property
     def anthropic_client(self) -> AsyncAnthropic:
-        """Lazy initialization of Anthropic client."""
+        """Shared Anthropic client, resolved on first use."""
         if self._anthropic_client is None:
-            if not self.settings.anthropic_api_key:
-                raise ValueError("Anthropic API key not configured")
-            self._anthropic_client = AsyncAnthropic(api_key=self.settings.anthropic_api_key)
+            self._anthropic_client = get_anthropic_client()
         return self._anthropic_client
     
+    async def _complete(self, **request_params: Any) -> Any:
+        """Chat completion, bounded by the process-wide LLM semaphore."""
+        async with get_llm_semaphore():
+            return await self.openai_client.chat.completions.create(**request_params)
+    
+    async def _open_stream(self, request_params: Dict[str, Any]) -> Tuple[Any, Any]:
+        """
+        Take an LLM slot, start a stream and wait for its first chunk.
+        
+        Returns (stream, first chunk or None); the caller must pass them to
+        _release_stream when done.
+        """
+        semaphore = get_llm_semaphore()
+        await semaphore.acquire()
+        try:
+            stream = await self.openai_client.chat.completions.create(**request_params)
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                first = None
+            except BaseException:
+                await stream.close()
+                raise
+            return stream, first
+        except BaseException:
+            semaphore.release()
+            raise
+    
+    async def _release_stream(self, opened: Tuple[Any, Any]) -> None:
+        """Close a stream from _open_stream and free its LLM slot."""
+        try:
+            await opened[0].close()
+        finally:
+            get_llm_semaphore().release()
+    
+    async def _stream_completion(
+        self,
+        request_params: Dict[str, Any],
+        hedge: bool = False,
+    ) -> AsyncGenerator[Any, None]:
+        """
+        Streamed chat completion chunks; a stream holds its upstream slot until it ends.
+        
+        With ``hedge``, time to first chunk is hedged like _hedged: the first
+        stream to produce a chunk is used and the other is closed.
+        """
+        if hedge:
+            opened = await self._hedged(lambda: self._open_stream(request_params), self._release_stream)
+        else:
+            opened = await self._open_stream(request_params)
+        try:
+            stream, first = opened
+            if first is None:
+                return
+            yield first
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await self._release_stream(opened)
+    
+    def _delta_batcher(self) -> DeltaBatcher:
+        """New batcher for one streamed response."""
+        return DeltaBatcher(
+            min_batch=self.stream_min_batch,
+            max_batch=self.stream_max_batch,
+            growth=self.stream_batch_growth,
+        )
+    
     # =========================================================================
     # Voice Response Generation (for Retell AI)
     # =========================================================================
@@ -107,7 +282,7 @@ class AIOrchestrator:
                 request_params["tool_choice"] = "auto"
             
             # Call OpenAI
-            response = await self.openai_client.chat.completions.create(**request_params)
+            response = await self._hedged(lambda: self._complete(**request_params))
             
             # Extract response
             message = response.choices[0].message
@@ -127,7 +302,7 @@ class AIOrchestrator:
                 result["function_call"] = {
                     "id": tool_call.id,
                     "name": tool_call.function.name,
-                    "arguments": json.loads(tool_call.function.arguments)
+                    "arguments": orjson.loads(tool_call.function.arguments)
                 }
             
             return result
@@ -140,6 +315,124 @@ class AIOrchestrator:
                 "error": str(e)
             }
     
+    async def _hedged(
+        self,
+        attempt: Callable[[], Awaitable[Any]],
+        discard: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ) -> Any:
+        """
+        Run attempt, optionally hedged with a duplicate.
+        
+        When voice hedging is enabled and the first attempt has not returned
+        within ``voice_hedge_delay``, an identical second attempt is started
+        and whichever succeeds first is used; the other is cancelled, and if
+        it had already succeeded its result is handed to ``discard``.
+        Completions have no side effects, so a discarded one only costs tokens.
+        """
+        if not self.settings.voice_hedge_enabled:
+            return await attempt()
+        
+        tasks = [asyncio.ensure_future(attempt())]
+        winner: Optional[asyncio.Future] = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.settings.voice_hedge_delay)
+            if not done:
+                tasks.append(asyncio.ensure_future(attempt()))
+            
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            losers = [task for task in tasks if task is not winner]
+            for task in losers:
+                task.cancel()
+            if discard and losers:
+                # Cleaned up in the background so the winner is not delayed
+                cleanup = asyncio.ensure_future(_discard_results(losers, discard))
+                _background_tasks.add(cleanup)
+                cleanup.add_done_callback(_background_tasks.discard)
+    
+    async def stream_voice_response(
+        self,
+        messages: List[Dict[str, Any]],
+        functions: Optional[List[Dict]] = None,
+        tenant_id: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream a response for voice interactions as it is generated.
+        
+        Same request as generate_voice_response, but yields events as the
+        LLM produces them so speech synthesis can start on the first words:
+        - {"type": "content", "content": str} for each text delta
+        - {"type": "function_call", "function_call": {...}} once at the end,
+          if the model called a tool (same shape as generate_voice_response)
+        """
+        model = model or self.voice_model
+        
+        try:
+            request_params = {
+                "model": model,
+                "messages": messages,
+                "temperature": 0.7,
+                "max_tokens": 200,  # Keep responses short for voice
+                "frequency_penalty": 0.3,
+                "stream": True,
+            }
+            
+            if functions:
+                request_params["tools"] = functions
+                request_params["tool_choice"] = "auto"
+            
+            # Tool call fragments arrive spread over many chunks
+            tool_call_id = None
+            tool_name = ""
+            tool_arguments: List[str] = []
+            
+            async for chunk in self._stream_completion(request_params, hedge=True):
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    yield {"type": "content", "content": delta.content}
+                if delta.tool_calls:
+                    # Only the first tool call is acted on, as in generate_voice_response
+                    tool_call = delta.tool_calls[0]
+                    if tool_call.index != 0:
+                        continue
+                    if tool_call.id:
+                        tool_call_id = tool_call.id
+                    if tool_call.function:
+                        tool_name += tool_call.function.name or ""
+                        tool_arguments.append(tool_call.function.arguments or "")
+            
+            if tool_name:
+                raw_arguments = "".join(tool_arguments) or "{}"
+                yield {
+                    "type": "function_call",
+                    "function_call": {
+                        "id": tool_call_id,
+                        "name": tool_name,
+                        "arguments": orjson.loads(raw_arguments),
+                        # Model's JSON text, for callers that forward it as-is
+                        "raw_arguments": raw_arguments,
+                    },
+                }
+            
+        except Exception as e:
+            logger.error(f"Error streaming voice response: {e}", exc_info=True)
+            yield {
+                "type": "content",
+                "content": "I apologize, I'm having a moment of difficulty. Could you please repeat that?",
+            }
+    
     # =========================================================================
     # Streaming Response Generation (for Chat UI)
     # =========================================================================
@@ -154,9 +447,11 @@ class AIOrchestrator:
         """
         Generate a streaming response for chat UI.
         
-        Yields content chunks as they're generated.
+        Yields content chunks as they're generated, coalesced into
+        progressively larger batches.
         """
         model = model or self.default_model
+        batcher = self._delta_batcher()
         
         try:
             request_params = {
@@ -171,14 +466,21 @@ class AIOrchestrator:
                 request_params["tools"] = functions
                 request_params["tool_choice"] = "auto"
             
-            stream = await self.openai_client.chat.completions.create(**request_params)
-            
-            async for chunk in stream:
+            async for chunk in self._stream_completion(request_params):
                 if chunk.choices and chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+                    text = batcher.add(chunk.choices[0].delta.content)
+                    if text:
+                        yield text
+            
+            text = batcher.flush()
+            if text:
+                yield text
                     
         except Exception as e:
             logger.error(f"Error in streaming response: {e}")
+            text = batcher.flush()
+            if text:
+                yield text
             yield f"I apologize, I encountered an error: {str(e)}"
     
     # =========================================================================
@@ -202,24 +504,11 @@ class AIOrchestrator:
         Returns:
             Dict with 'intent', 'confidence', and 'entities'
         """
-        intent_descriptions = "\n".join([
-            f"- {i['name']}: {i['description']}"
-            for i in intents
-        ])
+        intents_key = tuple((i["name"], i["description"]) for i in intents)
+        system_prompt = _render_intent_prompt(intents_key)
         
-        system_prompt = f"""You are an intent classifier for a dental practice. 
-Classify the user's message into one of these intents:
-
-{intent_descriptions}
-
-Respond with JSON containing:
-- intent: the classified intent name
-- confidence: confidence score 0-1
-- entities: extracted entities (dates, names, procedures, etc.)
-"""
-        
-        try:
-            response = await self.openai_client.chat.completions.create(
+        async def classify() -> Dict[str, Any]:
+            response = await self._complete(
                 model=self.fast_model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -229,9 +518,17 @@ Respond with JSON containing:
                 max_tokens=200,
                 response_format={"type": "json_object"}
             )
-            
-            result = json.loads(response.choices[0].message.content)
-            return result
+            return orjson.loads(response.choices[0].message.content)
+        
+        try:
+            # Low temperature: a repeated message gets the same answer, and
+            # rephrasings differing only in case or punctuation share it
+            result = await get_llm_cache().get_or_load(
+                llm_cache_key("classify_intent", self.fast_model, intents_key, normalized_text(message)),
+                classify,
+            )
+            # Shallow copy so callers cannot alter the cached result
+            return dict(result)
             
         except Exception as e:
             logger.error(f"Error classifying intent: {e}")
@@ -268,8 +565,8 @@ Respond with JSON containing:
         
         prompt = prompts.get(summary_type, prompts["general"])
         
-        try:
-            response = await self.openai_client.chat.completions.create(
+        async def summarize() -> str:
+            response = await self._complete(
                 model=self.fast_model,
                 messages=[
                     {"role": "system", "content": f"{prompt} Keep the summary under {max_length} words."},
@@ -278,12 +575,19 @@ Respond with JSON containing:
                 temperature=0.3,
                 max_tokens=max_length * 2  # Rough token estimate
             )
+            return response.choices[0].message.content
+        
+        try:
+            summary = await get_llm_cache().get_or_load(
+                llm_cache_key("generate_summary", self.fast_model, prompt, max_length, content),
+                summarize,
+            )
             
             return {
-                "summary": response.choices[0].message.content,
+                "summary": summary,
                 "summary_type": summary_type,
                 "original_length": len(content),
-                "summary_length": len(response.choices[0].message.content)
+                "summary_length": len(summary)
             }
             
         except Exception as e:
@@ -346,7 +650,7 @@ Respond with JSON containing:
                 request_params["stream"] = True
                 return {"stream": self._stream_chat(request_params)}
             
-            response = await self.openai_client.chat.completions.create(**request_params)
+            response = await self._complete(**request_params)
             
             message = response.choices[0].message
             
@@ -380,19 +684,73 @@ Respond with JSON containing:
             }
     
     async def _stream_chat(self, request_params: Dict) -> AsyncGenerator[Dict, None]:
-        """Internal streaming chat generator."""
+        """
+        Internal streaming chat generator.
+        
+        Yields {"type": "content", "content": str} as text arrives and one
+        {"type": "tool_call_complete", "tool_call": {...}} per tool call once
+        the model finishes, with its arguments parsed (same shape as a
+        ``tool_calls`` entry from non-streaming chat otherwise).
+        """
+        batcher = self._delta_batcher()
+        # Argument fragments per tool call index, joined and parsed once
+        tool_buf: Dict[int, Dict[str, Any]] = {}
+        
+        def complete_tool_calls() -> List[Dict[str, Any]]:
+            events = [
+                {
+                    "type": "tool_call_complete",
+                    "tool_call": {
+                        "id": call["id"],
+                        "type": "function",
+                        "function": {
+                            "name": call["name"],
+                            "arguments": orjson.loads("".join(call["arguments"]) or "{}"),
+                        },
+                    },
+                }
+                for _, call in sorted(tool_buf.items())
+            ]
+            tool_buf.clear()
+            return events
+        
         try:
-            stream = await self.openai_client.chat.completions.create(**request_params)
+            async for chunk in self._stream_completion(request_params):
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                delta = choice.delta
+                if delta.content:
+                    text = batcher.add(delta.content)
+                    if text:
+                        yield {"type": "content", "content": text}
+                for tool_call in delta.tool_calls or ():
+                    call = tool_buf.setdefault(
+                        tool_call.index, {"id": None, "name": "", "arguments": []}
+                    )
+                    if tool_call.id:
+                        call["id"] = tool_call.id
+                    if tool_call.function:
+                        call["name"] += tool_call.function.name or ""
+                        call["arguments"].append(tool_call.function.arguments or "")
+                if choice.finish_reason and tool_buf:
+                    # Keep content ahead of the tool calls it preceded
+                    text = batcher.flush()
+                    if text:
+                        yield {"type": "content", "content": text}
+                    for event in complete_tool_calls():
+                        yield event
             
-            async for chunk in stream:
-                if chunk.choices:
-                    delta = chunk.choices[0].delta
-                    if delta.content:
-                        yield {"type": "content", "content": delta.content}
-                    if delta.tool_calls:
-                        yield {"type": "tool_call", "tool_calls": delta.tool_calls}
+            text = batcher.flush()
+            if text:
+                yield {"type": "content", "content": text}
+            for event in complete_tool_calls():
+                yield event
                         
         except Exception as e:
+            text = batcher.flush()
+            if text:
+                yield {"type": "content", "content": text}
             yield {"type": "error", "error": str(e)}
     
     def _get_default_system_prompt(self) -> str:
@@ -425,16 +783,30 @@ You have access to the practice's patient records, appointments, and billing inf
         texts: List[str],
         model: Optional[str] = None
     ) -> List[List[float]]:
-        """Generate embeddings for texts using OpenAI."""
+        """
+        Generate embeddings for texts using OpenAI.
+        
+        Large inputs are split into sub-batches requested concurrently,
+        with in-flight requests capped process-wide. The OpenAI client
+        retries each sub-batch on 429/5xx with backoff, so one rate-limited
+        batch does not fail the rest.
+        """
         model = model or self.settings.openai_embedding_model
         
-        try:
-            response = await self.openai_client.embeddings.create(
-                model=model,
-                input=texts
-            )
-            
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with get_embedding_semaphore():
+                response = await self.openai_client.embeddings.create(
+                    model=model,
+                    input=batch
+                )
             return [item.embedding for item in response.data]
+        
+        try:
+            batches = await asyncio.gather(*[
+                embed_batch(texts[i:i + EMBEDDING_BATCH_SIZE])
+                for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+            ])
+            return [embedding for batch in batches for embedding in batch]
             
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
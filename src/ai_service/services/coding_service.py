@@ -8,16 +8,24 @@ Handles:
 - Human-in-the-loop approval workflow integration
 """
 
+import asyncio
+import logging
 import time
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
 import asyncpg
+from fastapi import Request
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 
+from ai_service.cache import TTLCache, get_llm_cache, llm_cache_key
 from ai_service.config import get_settings
+from ai_service.db import get_pool
+
+logger = logging.getLogger(__name__)
 
 # CDT Code categories
 CDT_CATEGORIES = [
@@ -61,6 +69,62 @@ class CodeValidationResponse(BaseModel):
     alternative_codes: List[str] = Field(default=[], description="Suggested alternative CDT codes")
 
 
+# Fixed SQL text, so each pooled connection prepares these once and reuses
+# the plan from asyncpg's statement cache.
+#
+# Global rows sort before the tenant's own, so a tenant override of a code
+# replaces the global row when the results are collected
+LOOKUP_CODES_SQL = """
+    SELECT code, description, category, default_fee
+    FROM procedure_codes
+    WHERE is_active = true
+      AND (tenant_id = $2 OR tenant_id IS NULL)
+      AND code = ANY($1::text[])
+    ORDER BY tenant_id NULLS FIRST
+"""
+
+ACTIVE_CODES_SQL = """
+    SELECT code, description, category, default_fee
+    FROM procedure_codes
+    WHERE is_active = true
+      AND (tenant_id = $1 OR tenant_id IS NULL)
+    ORDER BY tenant_id NULLS FIRST
+"""
+
+# Both ILIKE conditions are served by the pg_trgm GIN indexes on code and
+# description (see docs/AI_IMPLEMENTATION_COMPLETE.md) instead of a scan
+SEARCH_CODES_SQL = """
+    SELECT code, description, category, default_fee
+    FROM procedure_codes
+    WHERE is_active = true
+      AND (tenant_id = $3 OR tenant_id IS NULL)
+      AND (code ILIKE $1 OR description ILIKE $1)
+      AND ($2::text IS NULL OR category::text = $2)
+    ORDER BY code ASC
+    LIMIT $4
+"""
+
+
+@lru_cache
+def get_code_cache() -> TTLCache:
+    """Procedure code rows by (tenant_id, code); the CDT catalog rarely changes."""
+    return TTLCache(maxsize=50_000, ttl=get_settings().procedure_code_cache_ttl)
+
+
+@lru_cache
+def get_catalog_cache() -> TTLCache:
+    """Tenants whose whole active catalog was loaded into the code cache."""
+    return TTLCache(maxsize=1024, ttl=get_settings().procedure_code_cache_ttl)
+
+
+def _code_info(row: asyncpg.Record) -> Dict[str, Any]:
+    return {
+        "description": row["description"],
+        "category": row["category"],
+        "default_fee": float(row["default_fee"]),
+    }
+
+
 class CodingService:
     """AI-assisted dental coding service using LangChain."""
 
@@ -154,34 +218,50 @@ Assess validity and suggest alternatives if needed.""",
 
     async def _get_pool(self) -> asyncpg.Pool:
         if self._pool is None:
-            self._pool = await asyncpg.create_pool(
-                dsn=self.settings.database_url,
-                min_size=1,
-                max_size=5,
-            )
+            self._pool = await get_pool()
         return self._pool
 
-    async def _lookup_codes(self, codes: List[str]) -> Dict[str, Dict[str, Any]]:
-        if not codes:
-            return {}
+    async def _lookup_codes(self, tenant_id: str, codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        missing = []
+        for code in codes:
+            row = get_code_cache().get((tenant_id, code))
+            if row is None:
+                missing.append(code)
+            else:
+                found[code] = row
+        if not missing:
+            return found
+
+        # Only codes not already cached go to the database
         pool = await self._get_pool()
         async with pool.acquire() as conn:
-            rows = await conn.fetch(
-                """
-                SELECT code, description, category, default_fee
-                FROM procedure_codes
-                WHERE is_active = true AND code = ANY($1::text[])
-                """,
-                codes,
-            )
-        return {
-            row["code"]: {
-                "description": row["description"],
-                "category": row["category"],
-                "default_fee": float(row["default_fee"]),
-            }
-            for row in rows
-        }
+            rows = await conn.fetch(LOOKUP_CODES_SQL, missing, tenant_id)
+        for row in rows:
+            found[row["code"]] = _code_info(row)
+            get_code_cache().set((tenant_id, row["code"]), found[row["code"]])
+        return found
+
+    async def _prefetch_catalog(self, tenant_id: str) -> None:
+        """
+        Load every active procedure code the tenant sees into the code cache.
+
+        Runs alongside the LLM call so the later lookup is served from
+        memory. A failure only means _lookup_codes queries as usual.
+        """
+
+        async def load() -> bool:
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(ACTIVE_CODES_SQL, tenant_id)
+            for row in rows:
+                get_code_cache().set((tenant_id, row["code"]), _code_info(row))
+            return True
+
+        try:
+            await get_catalog_cache().get_or_load(tenant_id, load)
+        except Exception as e:
+            logger.warning("Procedure code prefetch failed: %s", e)
 
     async def suggest_codes(
         self,
@@ -200,18 +280,31 @@ Assess validity and suggest alternatives if needed.""",
         """
         start_time = time.time()
 
-        result: CodingSuggestionResponse = await self.chain.ainvoke(
-            {
-                "clinical_notes": clinical_notes,
-                "patient_age": patient_age,
-                "previous_notes": previous_notes,
-            }
+        inputs = {
+            "clinical_notes": clinical_notes,
+            "patient_age": patient_age,
+            "previous_notes": previous_notes,
+        }
+
+        async def suggest() -> CodingSuggestionResponse:
+            # Validated inside the loader so a reply that fails the schema
+            # raises here and is never cached
+            return CodingSuggestionResponse.model_validate(await self.chain.ainvoke(inputs))
+
+        # Identical notes get the same low-temperature answer; reuse it.
+        # The catalog loads while the LLM is still working
+        result, _ = await asyncio.gather(
+            get_llm_cache().get_or_load(
+                llm_cache_key("suggest_codes", tenant_id, self.settings.openai_model, inputs),
+                suggest,
+            ),
+            self._prefetch_catalog(tenant_id),
         )
 
         suggestions = [s.model_dump() for s in result.suggestions]
 
         # Enrich descriptions from procedure code database
-        code_lookup = await self._lookup_codes([s["code"] for s in suggestions])
+        code_lookup = await self._lookup_codes(tenant_id, [s["code"] for s in suggestions])
         for s in suggestions:
             if s["code"] in code_lookup:
                 s["description"] = code_lookup[s["code"]]["description"]
@@ -221,7 +314,7 @@ Assess validity and suggest alternatives if needed.""",
 
         return {
             "suggestions": suggestions,
-            "warnings": result.warnings,
+            "warnings": list(result.warnings),
             "notes": result.notes,
             "processing_time_ms": processing_time,
         }
@@ -235,15 +328,24 @@ Assess validity and suggest alternatives if needed.""",
         """
         Validate if a CDT code is appropriate for the clinical notes.
         """
-        validation: CodeValidationResponse = await self.validation_chain.ainvoke(
-            {
-                "clinical_notes": clinical_notes,
-                "code": code,
-            }
+        inputs = {
+            "clinical_notes": clinical_notes,
+            "code": code,
+        }
+
+        async def validate() -> CodeValidationResponse:
+            return CodeValidationResponse.model_validate(await self.validation_chain.ainvoke(inputs))
+
+        # The code is known up front, so check it exists in the procedure
+        # code table while the LLM validates it
+        validation, code_lookup = await asyncio.gather(
+            get_llm_cache().get_or_load(
+                llm_cache_key("validate_code", tenant_id, self.settings.openai_model, inputs),
+                validate,
+            ),
+            self._lookup_codes(tenant_id, [code]),
         )
 
-        # Ensure the code exists in the procedure code table
-        code_lookup = await self._lookup_codes([code])
         issues = list(validation.issues)
         if code not in code_lookup:
             issues.append("Code not found in active CDT catalog")
@@ -252,7 +354,7 @@ Assess validity and suggest alternatives if needed.""",
             "is_valid": validation.is_valid and code in code_lookup,
             "confidence": validation.confidence,
             "issues": issues,
-            "alternative_codes": validation.alternative_codes,
+            "alternative_codes": list(validation.alternative_codes),
         }
 
     async def search_codes(
@@ -269,16 +371,7 @@ Assess validity and suggest alternatives if needed.""",
         search_term = f"%{query}%"
         async with pool.acquire() as conn:
             rows = await conn.fetch(
-                """
-                SELECT code, description, category, default_fee
-                FROM procedure_codes
-                WHERE is_active = true
-                  AND (tenant_id = $3 OR tenant_id IS NULL)
-                  AND (code ILIKE $1 OR description ILIKE $1)
-                  AND ($2::text IS NULL OR category::text = $2)
-                ORDER BY code ASC
-                LIMIT $4
-                """,
+                SEARCH_CODES_SQL,
                 search_term,
                 category,
                 tenant_id,
@@ -296,6 +389,6 @@ Assess validity and suggest alternatives if needed.""",
         ]
 
 
-def get_coding_service() -> CodingService:
-    """Dependency injection for coding service."""
-    return CodingService()
+def get_coding_service(request: Request) -> CodingService:
+    """Dependency injection for coding service (app-wide singleton)."""
+    return request.app.state.coding_service
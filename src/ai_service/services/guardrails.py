@@ -18,6 +18,11 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 
 
+def _compile_any(patterns: List[str]) -> "re.Pattern":
+    """Compile patterns into a single regex matching any of them."""
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
 class HIPAAGuardrails:
     """
     HIPAA-compliant guardrails for AI responses.
@@ -63,6 +68,18 @@ class HIPAAGuardrails:
             "credit_card": r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b",
         }
         
+        # Message checks in priority order. Each category is compiled into
+        # one alternation, so a clean message costs one scan per category
+        # rather than one per pattern
+        self._message_checks = [
+            (guardrail_type, severity, _compile_any(patterns), [re.compile(p) for p in patterns])
+            for guardrail_type, severity, patterns in (
+                ("emergency", "high", self.emergency_patterns),
+                ("diagnosis", "medium", self.diagnosis_patterns),
+                ("coverage_guarantee", "low", self.coverage_guarantee_patterns),
+            )
+        ]
+        
         # Standard responses for blocked queries
         self.blocked_responses = {
             "diagnosis": "I'm not able to provide medical diagnoses. I'd recommend scheduling an appointment with one of our dentists who can properly examine you and provide a professional assessment. Would you like me to help you schedule an appointment?",
@@ -83,37 +100,17 @@ class HIPAAGuardrails:
         """
         message_lower = message.lower()
         
-        # Check for emergency first (highest priority)
-        for pattern in self.emergency_patterns:
-            if re.search(pattern, message_lower):
-                return {
-                    "blocked": True,
-                    "guardrail_type": "emergency",
-                    "message": self.blocked_responses["emergency"],
-                    "severity": "high",
-                    "matched_pattern": pattern
-                }
-        
-        # Check for diagnosis requests
-        for pattern in self.diagnosis_patterns:
-            if re.search(pattern, message_lower):
-                return {
-                    "blocked": True,
-                    "guardrail_type": "diagnosis",
-                    "message": self.blocked_responses["diagnosis"],
-                    "severity": "medium",
-                    "matched_pattern": pattern
-                }
-        
-        # Check for coverage guarantee requests
-        for pattern in self.coverage_guarantee_patterns:
-            if re.search(pattern, message_lower):
+        # Emergency first (highest priority), then diagnosis, then coverage
+        for guardrail_type, severity, combined, compiled in self._message_checks:
+            if combined.search(message_lower):
+                # Rare path: report the first listed pattern that matched
+                matched = next(c for c in compiled if c.search(message_lower))
                 return {
                     "blocked": True,
-                    "guardrail_type": "coverage_guarantee",
-                    "message": self.blocked_responses["coverage_guarantee"],
-                    "severity": "low",
-                    "matched_pattern": pattern
+                    "guardrail_type": guardrail_type,
+                    "message": self.blocked_responses[guardrail_type],
+                    "severity": severity,
+                    "matched_pattern": matched.pattern
                 }
         
         # No guardrails triggered
@@ -8,14 +8,22 @@ Handles:
 - Response suggestion for voice/chat bots
 """
 
-import json
-from typing import Any, Dict, List, Optional
-
-from openai import AsyncOpenAI
+import asyncio
+import copy
+import logging
+import re
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set, Tuple
+
+import orjson
+from fastapi import Request
 from pydantic import BaseModel, Field
 
+from ai_service.cache import get_llm_cache, llm_cache_key, normalized_text
+from ai_service.clients import get_llm_semaphore, get_openai_client
 from ai_service.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 # Intent definitions with example phrases
 INTENT_DEFINITIONS = {
     "schedule_appointment": {
@@ -77,6 +85,33 @@ INTENT_DEFINITIONS = {
 }
 
 
+# Unambiguous phrasings answered without an LLM call. All alternatives are
+# scanned in one pass; a message takes the fast path only when exactly one
+# intent matches and it is not negated or joined to another request.
+FAST_PATH_PATTERN = re.compile(
+    r"(?P<reschedule_appointment>\breschedul\w*)"
+    r"|(?P<cancel_appointment>\bcancel\w*\b.*\b(?:appointment|visit|cleaning)\b)"
+    r"|(?P<schedule_appointment>\b(?:schedule|book|make)\s+(?:an?\s+|my\s+)?(?:appointment|cleaning|checkup|visit)\b)"
+    r"|(?P<check_insurance>\b(?:accept|take)\b.*\binsurance\b)"
+    r"|(?P<billing_inquiry>\bpayment plan\b|\bhow much do i owe\b|\bmy bill\b)"
+    r"|(?P<emergency>\b(?:i have|i've got|i got|i'm having|i am having|this is|it's|it is)\s+(?:an?\s+)?(?:dental\s+)?emergency\b)"
+    r"|(?P<speak_to_human>\b(?:speak|talk)\s+(?:to|with)\s+(?:a\s+|an\s+|the\s+)?(?:human|person|real person|someone|receptionist|staff)\b|\btransfer me\b)",
+    re.IGNORECASE,
+)
+# Negations, compound requests, and questions about policies, fees or hours
+# (e.g. "what is your cancellation policy?") are left to the LLM
+FAST_PATH_BLOCKERS = re.compile(
+    r"\b(?:not|no|never|dont|and|but|or|then"
+    r"|polic(?:y|ies)|fees?|hours|how do|what is|what's|do you have)\b|n't\b|\?",
+    re.IGNORECASE,
+)
+
+
+CHAT_SYSTEM_PROMPT = """You are CrownDesk AI Assistant, helping dental practice staff and patients in the chat sidebar.
+You can help with scheduling, insurance questions, billing inquiries, and general practice information.
+Be concise and friendly. Never provide medical diagnoses or guarantee insurance coverage."""
+
+
 class IntentEntity(BaseModel):
     """Entity extracted from patient message."""
     type: str = Field(description="Entity type: date_reference, procedure_type, insurance_provider, etc.")
@@ -97,7 +132,7 @@ class IntentService:
 
     def __init__(self):
         self.settings = get_settings()
-        self.openai_client = AsyncOpenAI(api_key=self.settings.openai_api_key)
+        self.openai_client = get_openai_client()
 
     async def classify(
         self,
@@ -109,7 +144,14 @@ class IntentService:
         Classify patient intent from message using LLM.
 
         Uses OpenAI structured outputs for reliable intent classification.
+        Unambiguous messages without prior context are answered from a
+        keyword fast path instead.
         """
+        if not context:
+            fast_result = self._fast_path_result(message)
+            if fast_result:
+                return fast_result
+
         # Build intent definitions for prompt
         intent_list = []
         for key, definition in INTENT_DEFINITIONS.items():
@@ -121,7 +163,8 @@ class IntentService:
         # Build prompt with context
         context_str = ""
         if context:
-            context_str = f"\n\nPrevious context:\n{json.dumps(context, indent=2)}"
+            context_json = orjson.dumps(context, option=orjson.OPT_INDENT_2, default=str).decode()
+            context_str = f"\n\nPrevious context:\n{context_json}"
         
         prompt = f"""You are analyzing a patient message to a dental practice.
 
@@ -135,17 +178,18 @@ Patient message: "{message}"{context_str}
 
 Provide your classification with confidence score and reasoning."""
 
-        try:
+        async def classify_with_llm() -> Dict[str, Any]:
             # Use structured outputs for reliable parsing
-            response = await self.openai_client.beta.chat.completions.parse(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a dental practice AI assistant that classifies patient intents."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format=IntentClassification,
-                temperature=0.1,
-            )
+            async with get_llm_semaphore():
+                response = await self.openai_client.beta.chat.completions.parse(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": "You are a dental practice AI assistant that classifies patient intents."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format=IntentClassification,
+                    temperature=0.1,
+                )
             
             classification = response.choices[0].message.parsed
             
@@ -166,6 +210,18 @@ Provide your classification with confidence score and reasoning."""
                 "suggested_response": self._generate_response(classification.intent),
                 "requires_human": classification.intent in ["emergency", "speak_to_human"],
             }
+
+        try:
+            if context:
+                return await classify_with_llm()
+            # Without context only the words matter, so rephrasings that
+            # differ in case, punctuation or spacing share one result
+            result = await get_llm_cache().get_or_load(
+                self._cache_key(tenant_id, message),
+                classify_with_llm,
+            )
+            # Deep copy so callers cannot alter the cached result
+            return copy.deepcopy(result)
             
         except Exception as e:
             # Fallback to simple classification on error
@@ -184,6 +240,71 @@ Provide your classification with confidence score and reasoning."""
                 "requires_human": primary_intent in ["emergency", "speak_to_human"],
             }
 
+    def classify_without_llm(
+        self,
+        tenant_id: str,
+        message: str,
+        context: Optional[Dict] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Classification available without an LLM call, if any.
+
+        Covers the keyword fast path and results already in the LLM cache;
+        returns None when the request would need the model.
+        """
+        if context:
+            return None
+        fast_result = self._fast_path_result(message)
+        if fast_result:
+            return fast_result
+        cached = get_llm_cache().get(self._cache_key(tenant_id, message))
+        return copy.deepcopy(cached) if cached is not None else None
+
+    def _cache_key(self, tenant_id: str, message: str) -> str:
+        """LLM cache key for a classification without context."""
+        return llm_cache_key("intent_classify", tenant_id, normalized_text(message))
+
+    def _fast_path_result(self, message: str) -> Optional[Dict[str, Any]]:
+        """Full classify result from the keyword fast path, or None."""
+        fast_intent = self._fast_classify(message)
+        if not fast_intent:
+            return None
+        return {
+            "primary_intent": {
+                "intent": fast_intent,
+                "confidence": 0.95,
+                "entities": self._extract_entities_simple(message),
+                "reasoning": "Unambiguous keyword match",
+            },
+            "secondary_intents": [],
+            "suggested_response": self._generate_response(fast_intent),
+            "requires_human": fast_intent in ["emergency", "speak_to_human"],
+        }
+
+    async def classify_batch(
+        self,
+        requests: List[Tuple[str, str, Optional[Dict]]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Classify a batch of (tenant_id, message, context) requests.
+
+        Requests run concurrently, and identical requests in the batch share
+        a single LLM call.
+        """
+        unique: Dict[bytes, Tuple[str, str, Optional[Dict]]] = {}
+        keys = []
+        for tenant_id, message, context in requests:
+            key = orjson.dumps([tenant_id, message, context], option=orjson.OPT_SORT_KEYS, default=str)
+            keys.append(key)
+            unique.setdefault(key, (tenant_id, message, context))
+
+        results = await asyncio.gather(
+            *[self.classify(tenant_id, message, context) for tenant_id, message, context in unique.values()]
+        )
+        by_key = dict(zip(unique, results))
+        # Duplicates each get their own copy of the shared result
+        return [copy.deepcopy(by_key[key]) for key in keys]
+
     async def extract_entities(
         self,
         tenant_id: str,
@@ -204,15 +325,16 @@ Patient message: "{message}"
 Return only the entities you find with confidence scores."""
 
         try:
-            response = await self.openai_client.beta.chat.completions.parse(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a dental practice AI assistant that extracts entities from patient messages."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format=IntentClassification,
-                temperature=0.1,
-            )
+            async with get_llm_semaphore():
+                response = await self.openai_client.beta.chat.completions.parse(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": "You are a dental practice AI assistant that extracts entities from patient messages."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format=IntentClassification,
+                    temperature=0.1,
+                )
             
             classification = response.choices[0].message.parsed
             
@@ -241,6 +363,13 @@ Return only the entities you find with confidence scores."""
                 "confidence": 0.70,
             }
 
+    def _fast_classify(self, message: str) -> Optional[str]:
+        """Return the intent if the message matches exactly one fast-path intent."""
+        if FAST_PATH_BLOCKERS.search(message):
+            return None
+        intents = {match.lastgroup for match in FAST_PATH_PATTERN.finditer(message)}
+        return intents.pop() if len(intents) == 1 else None
+
     def _simple_classify(self, message: str) -> str:
         """Simple keyword-based classification (fallback when LLM fails)."""
         message_lower = message.lower()
@@ -424,6 +553,37 @@ Return only the entities you find with confidence scores."""
             "entities": entities,
         }
     
+    async def stream_chat_response(
+        self,
+        tenant_id: str,
+        messages: List[Dict[str, str]],
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream a conversational response for the AI chat sidebar.
+        
+        Yields content deltas as the LLM produces them, so the first token
+        reaches the client without waiting for the full completion.
+        """
+        try:
+            # A stream occupies an upstream slot until it finishes
+            async with get_llm_semaphore():
+                stream = await self.openai_client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+                        *messages[-10:],  # Last 10 messages for context
+                    ],
+                    temperature=0.7,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                    
+        except Exception as e:
+            logger.error("Chat streaming error: %s", e)
+            yield "I apologize, but I'm having trouble processing your request right now. Please try again or contact our office directly for assistance."
+    
     def _get_scheduling_response(self, entities: Dict, context: str) -> str:
         """Generate scheduling-specific response."""
         procedure = entities.get("procedure_type", "")
@@ -461,6 +621,97 @@ Return only the entities you find with confidence scores."""
         return "I'm here to help! I can assist with scheduling appointments, answering insurance questions, and billing inquiries. What can I help you with today?"
 
 
-def get_intent_service() -> IntentService:
-    """Dependency injection for intent service."""
-    return IntentService()
+class IntentBatcher:
+    """
+    Coalesces concurrent classify calls into micro-batches.
+
+    Requests wait up to ``window_ms`` (or until ``max_batch`` are queued) and
+    are then handed to ``IntentService.classify_batch`` together.
+    """
+
+    def __init__(self, service: IntentService, max_batch: int = 32, window_ms: int = 20):
+        self.service = service
+        self.max_batch = max_batch
+        self.window = window_ms / 1000
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._dispatches: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start the background coalescer loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the coalescer loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def classify(
+        self,
+        tenant_id: str,
+        message: str,
+        context: Optional[Dict] = None,
+    ) -> Dict[str, Any]:
+        """
+        Queue a classify request and wait for its batched result.
+
+        Requests answered by the fast path or the LLM cache return at once;
+        only those that need the model wait for a batch.
+        """
+        result = self.service.classify_without_llm(tenant_id, message, context)
+        if result is not None:
+            return result
+        if self._task is None:
+            return await self.service.classify(tenant_id, message, context)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(((tenant_id, message, context), future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(items) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Dispatch without blocking collection of the next batch
+            task = asyncio.create_task(self._dispatch(items))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, items: List[Tuple[Tuple[str, str, Optional[Dict]], asyncio.Future]]) -> None:
+        try:
+            results = await self.service.classify_batch([request for request, _ in items])
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def get_intent_service(request: Request) -> IntentService:
+    """Dependency injection for intent service (app-wide singleton)."""
+    return request.app.state.intent_service
+
+
+def get_intent_batcher(request: Request) -> IntentBatcher:
+    """Dependency injection for the intent classify batcher."""
+    return request.app.state.intent_batcher
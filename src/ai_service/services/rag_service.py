@@ -11,23 +11,39 @@ Handles:
 """
 
 import asyncio
+import base64
+import hashlib
 import io
 import logging
 import time
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 
 import asyncpg
 import boto3
-from openai import AsyncOpenAI
-from pgvector.asyncpg import register_vector
+import numpy as np
+from openai import NOT_GIVEN, AsyncOpenAI
 from pypdf import PdfReader
 from docx import Document as DocxDocument
+from fastapi import Request
 from unstructured.partition.auto import partition
 
+from ai_service.clients import get_embedding_semaphore, get_llm_semaphore, get_openai_client
 from ai_service.config import get_settings
+from ai_service.db import get_pool
 
 logger = logging.getLogger(__name__)
 
+# Inputs per embeddings request; sub-batches are sent concurrently
+EMBEDDING_BATCH_SIZE = 96
+
+ANSWER_SYSTEM_PROMPT = (
+    "You are a clinical assistant for a dental practice. "
+    "Answer the question using only the provided context. "
+    "If the context is insufficient, say so."
+)
+NO_CONTEXT_ANSWER = "No relevant document content found for this query."
+
 
 class RAGService:
     """RAG pipeline service for document Q&A."""
@@ -36,6 +52,7 @@ class RAGService:
         self.settings = get_settings()
         self._pool: Optional[asyncpg.Pool] = None
         self._openai_client: Optional[AsyncOpenAI] = None
+        self._query_embeddings: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
         self._s3_client = boto3.client(
             "s3",
             region_name=self.settings.aws_region,
@@ -43,23 +60,13 @@ class RAGService:
 
     async def _get_pool(self) -> asyncpg.Pool:
         if self._pool is None:
-            async def _init(conn: asyncpg.Connection) -> None:
-                await register_vector(conn)
-
-            self._pool = await asyncpg.create_pool(
-                dsn=self.settings.database_url,
-                min_size=1,
-                max_size=5,
-                init=_init,
-            )
+            self._pool = await get_pool()
         return self._pool
 
     @property
     def openai_client(self) -> AsyncOpenAI:
         if self._openai_client is None:
-            if not self.settings.openai_api_key:
-                raise ValueError("OpenAI API key not configured")
-            self._openai_client = AsyncOpenAI(api_key=self.settings.openai_api_key)
+            self._openai_client = get_openai_client()
         return self._openai_client
 
     async def _fetch_document_metadata(self, tenant_id: str, document_id: str) -> Dict[str, Any]:
@@ -138,19 +145,55 @@ class RAGService:
 
         return chunks
 
-    async def _embed_texts(self, texts: List[str]) -> List[List[float]]:
-        embeddings: List[List[float]] = []
-        batch_size = 50
-
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+    async def _embed_batch(self, batch: List[str]) -> List[np.ndarray]:
+        async with get_embedding_semaphore():
             response = await self.openai_client.embeddings.create(
                 model=self.settings.openai_embedding_model,
                 input=batch,
+                dimensions=self.settings.openai_embedding_dimensions or NOT_GIVEN,
+                encoding_format="base64",
             )
-            embeddings.extend([item.embedding for item in response.data])
+        return [
+            np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)
+            for item in response.data
+        ]
 
-        return embeddings
+    async def _embed_texts(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embed texts as float32 vectors.
+
+        Embeddings are requested base64-encoded and decoded straight into
+        float32 arrays, which pgvector's binary codec writes without
+        per-element Python float conversion. Sub-batches are requested
+        concurrently, with in-flight requests capped process-wide to stay
+        under the OpenAI rate limit.
+        """
+        batch_size = EMBEDDING_BATCH_SIZE
+        batches = await asyncio.gather(
+            *[self._embed_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        )
+        return [embedding for batch in batches for embedding in batch]
+
+    async def _embed_query(self, tenant_id: str, query: str) -> np.ndarray:
+        """
+        Embed a search query, reusing recent embeddings of the same text.
+
+        Query traffic repeats heavily (FAQs, retries, rephrased voice turns),
+        so embeddings are kept in a per-process LRU keyed on the tenant and a
+        hash of the normalized query.
+        """
+        text = query.strip()
+        key = (tenant_id, hashlib.sha1(text.lower().encode()).hexdigest())
+        cached = self._query_embeddings.get(key)
+        if cached is not None:
+            self._query_embeddings.move_to_end(key)
+            return cached
+
+        embedding = (await self._embed_texts([text]))[0]
+        self._query_embeddings[key] = embedding
+        if len(self._query_embeddings) > self.settings.query_embedding_cache_size:
+            self._query_embeddings.popitem(last=False)
+        return embedding
 
     async def ingest_document(
         self,
@@ -175,7 +218,9 @@ class RAGService:
             raise ValueError("S3 key mismatch for document")
 
         s3_result = await self._download_from_s3(s3_key)
-        raw_text = self._extract_text(
+        # Parsing is CPU-bound and synchronous; keep it off the event loop
+        raw_text = await asyncio.to_thread(
+            self._extract_text,
             s3_result["content"],
             s3_result.get("content_type") or metadata["mime_type"],
             metadata["file_name"],
@@ -226,26 +271,19 @@ class RAGService:
             "status": "processed",
         }
 
-    async def query(
+    async def retrieve(
         self,
         tenant_id: str,
         query: str,
         patient_id: Optional[str] = None,
         top_k: int = 5,
-    ) -> Dict[str, Any]:
+    ) -> Tuple[List[Dict[str, Any]], str]:
         """
-        Query the knowledge base using semantic search.
+        Retrieve the chunks most similar to a query.
 
-        Steps:
-        1. Embed the query
-        2. Vector similarity search with tenant filter
-        3. Build context from retrieved chunks
-        4. Generate answer with LLM
+        Returns the source payloads and the context string built from them.
         """
-        start_time = time.time()
-
-        query_embedding = await self._embed_texts([query])
-        embedding = query_embedding[0]
+        embedding = await self._embed_query(tenant_id, query)
 
         pool = await self._get_pool()
         async with pool.acquire() as conn:
@@ -291,43 +329,91 @@ class RAGService:
             )
             context_parts.append(row["content"])
 
-        context = "\n\n".join(context_parts)
+        return sources, "\n\n".join(context_parts)
+
+    @staticmethod
+    def answer_confidence(sources: List[Dict[str, Any]], top_k: int) -> float:
+        """Confidence heuristic based on how many of top_k chunks were found."""
+        if not sources:
+            return 0.0
+        return min(0.95, max(0.2, len(sources) / max(top_k, 1)))
+
+    @staticmethod
+    def _answer_messages(query: str, context: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": ANSWER_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {query}"},
+        ]
+
+    async def query(
+        self,
+        tenant_id: str,
+        query: str,
+        patient_id: Optional[str] = None,
+        top_k: int = 5,
+    ) -> Dict[str, Any]:
+        """
+        Query the knowledge base using semantic search.
+
+        Steps:
+        1. Embed the query
+        2. Vector similarity search with tenant filter
+        3. Build context from retrieved chunks
+        4. Generate answer with LLM
+        """
+        start_time = time.time()
+
+        sources, context = await self.retrieve(tenant_id, query, patient_id, top_k)
 
         if not context:
-            answer = "No relevant document content found for this query."
-            confidence = 0.0
+            answer = NO_CONTEXT_ANSWER
         else:
-            response = await self.openai_client.chat.completions.create(
-                model=self.settings.openai_model,
-                temperature=0.2,
-                max_tokens=600,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a clinical assistant for a dental practice. "
-                            "Answer the question using only the provided context. "
-                            "If the context is insufficient, say so."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Context:\n{context}\n\nQuestion: {query}",
-                    },
-                ],
-            )
+            async with get_llm_semaphore():
+                response = await self.openai_client.chat.completions.create(
+                    model=self.settings.openai_model,
+                    temperature=0.2,
+                    max_tokens=600,
+                    messages=self._answer_messages(query, context),
+                )
             answer = response.choices[0].message.content or ""
-            confidence = min(0.95, max(0.2, len(sources) / max(top_k, 1)))
 
         processing_time = int((time.time() - start_time) * 1000)
 
         return {
             "answer": answer,
             "sources": sources,
-            "confidence": confidence,
+            "confidence": self.answer_confidence(sources, top_k),
             "processing_time_ms": processing_time,
         }
 
+    async def answer_stream(self, query: str, context: str) -> AsyncGenerator[str, None]:
+        """
+        Stream an answer over retrieved context as the LLM produces it.
+
+        Errors after the first token cannot change the response status, so
+        they end the stream with an apology instead of raising.
+        """
+        if not context:
+            yield NO_CONTEXT_ANSWER
+            return
+
+        try:
+            # A stream occupies an upstream slot until it finishes
+            async with get_llm_semaphore():
+                stream = await self.openai_client.chat.completions.create(
+                    model=self.settings.openai_model,
+                    temperature=0.2,
+                    max_tokens=600,
+                    messages=self._answer_messages(query, context),
+                    stream=True,
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error("RAG answer streaming failed: %s", e)
+            yield "I'm having trouble generating an answer right now. Please try again."
+
     async def get_chunks(
         self,
         tenant_id: str,
@@ -347,15 +433,7 @@ class RAGService:
                 document_id,
                 tenant_id,
             )
-        return [
-            {
-                "id": row["id"],
-                "content": row["content"],
-                "chunk_index": row["chunk_index"],
-                "metadata": row["metadata"],
-            }
-            for row in rows
-        ]
+        return [dict(row) for row in rows]
 
     async def delete_document(
         self,
@@ -380,6 +458,6 @@ class RAGService:
         return result.startswith("DELETE")
 
 
-def get_rag_service() -> RAGService:
-    """Dependency injection for RAG service."""
-    return RAGService()
+def get_rag_service(request: Request) -> RAGService:
+    """Dependency injection for RAG service (app-wide singleton)."""
+    return request.app.state.rag_service
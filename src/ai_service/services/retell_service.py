@@ -17,8 +17,10 @@ from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
 import asyncpg
+from fastapi import Request
 
 from ai_service.config import Settings
+from ai_service.db import get_pool
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +43,13 @@ class RetellService:
         self.backend_url = getattr(settings, 'backend_url', 'http://localhost:3001')
         self._pool: Optional[asyncpg.Pool] = None
         
+        # One keepalive client for Retell and backend calls, so tool calls
+        # reuse connections instead of paying TCP/TLS setup each time
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=httpx.Timeout(5.0),
+        )
+        
         # WebSocket URL for our custom LLM endpoint
         self.llm_websocket_url = getattr(
             settings, 
@@ -50,13 +59,13 @@ class RetellService:
 
     async def _get_pool(self) -> asyncpg.Pool:
         if self._pool is None:
-            self._pool = await asyncpg.create_pool(
-                dsn=self.settings.database_url,
-                min_size=1,
-                max_size=5,
-            )
+            self._pool = await get_pool()
         return self._pool
 
+    async def close(self) -> None:
+        """Close the shared HTTP client on shutdown."""
+        await self._http_client.aclose()
+
     def _parse_date(self, value: str) -> datetime:
         for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%m-%d-%Y"):
             try:
@@ -92,82 +101,82 @@ class RetellService:
         if not self.retell_api_key:
             raise ValueError("Retell API key not configured")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.retell_base_url}/create-agent",
-                headers={
-                    "Authorization": f"Bearer {self.retell_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "agent_name": agent_name,
-                    "response_engine": {
-                        "type": "retell-llm",
-                        "llm_websocket_url": f"{self.llm_websocket_url}?tenant_id={tenant_id}"
-                    },
-                    "voice_id": voice_id or "eleven_labs_rachel",
-                    "language": language,
-                    "vocab_specialization": "medical",  # Healthcare-specific transcription
-                    "enable_backchannel": True,
-                    "ambient_sound": None,
-                    "responsiveness": 0.7,
-                    "interruption_sensitivity": 0.6,
-                    "reminder_trigger_ms": 8000,
-                    "reminder_max_count": 2,
-                    "end_call_after_silence_ms": 30000,
-                    "max_call_duration_ms": 1800000,  # 30 minutes
-                    "normalize_for_speech": True,
-                    "opt_out_sensitive_data_storage": False,  # We handle HIPAA via BAA
-                }
-            )
-            
-            if response.status_code != 201:
-                logger.error(f"Failed to create agent: {response.text}")
-                raise Exception(f"Failed to create Retell agent: {response.text}")
-            
-            agent_data = response.json()
-            
-            # Store agent config in our database (to be implemented)
-            # await self._store_agent_config(tenant_id, agent_data)
-            
-            return {
-                "agent_id": agent_data["agent_id"],
+        client = self._http_client
+        response = await client.post(
+            f"{self.retell_base_url}/create-agent",
+            headers={
+                "Authorization": f"Bearer {self.retell_api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
                 "agent_name": agent_name,
-                "llm_websocket_url": f"{self.llm_websocket_url}?tenant_id={tenant_id}",
-                "voice_id": agent_data.get("voice_id"),
-                "language": language
+                "response_engine": {
+                    "type": "retell-llm",
+                    "llm_websocket_url": f"{self.llm_websocket_url}?tenant_id={tenant_id}"
+                },
+                "voice_id": voice_id or "eleven_labs_rachel",
+                "language": language,
+                "vocab_specialization": "medical",  # Healthcare-specific transcription
+                "enable_backchannel": True,
+                "ambient_sound": None,
+                "responsiveness": 0.7,
+                "interruption_sensitivity": 0.6,
+                "reminder_trigger_ms": 8000,
+                "reminder_max_count": 2,
+                "end_call_after_silence_ms": 30000,
+                "max_call_duration_ms": 1800000,  # 30 minutes
+                "normalize_for_speech": True,
+                "opt_out_sensitive_data_storage": False,  # We handle HIPAA via BAA
             }
+        )
+        
+        if response.status_code != 201:
+            logger.error(f"Failed to create agent: {response.text}")
+            raise Exception(f"Failed to create Retell agent: {response.text}")
+            
+        agent_data = response.json()
+        
+        # Store agent config in our database (to be implemented)
+        # await self._store_agent_config(tenant_id, agent_data)
+        
+        return {
+            "agent_id": agent_data["agent_id"],
+            "agent_name": agent_name,
+            "llm_websocket_url": f"{self.llm_websocket_url}?tenant_id={tenant_id}",
+            "voice_id": agent_data.get("voice_id"),
+            "language": language
+        }
     
     async def get_agents(self, tenant_id: str) -> List[Dict[str, Any]]:
         """Get all agents for a tenant."""
         if not self.retell_api_key:
             raise ValueError("Retell API key not configured")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.retell_base_url}/list-agents",
-                headers={
-                    "Authorization": f"Bearer {self.retell_api_key}",
-                    "Content-Type": "application/json",
-                },
-                timeout=10.0,
-            )
-
-            if response.status_code != 200:
-                logger.error(f"Failed to list agents: {response.text}")
-                raise Exception(f"Failed to list Retell agents: {response.text}")
+        client = self._http_client
+        response = await client.get(
+            f"{self.retell_base_url}/list-agents",
+            headers={
+                "Authorization": f"Bearer {self.retell_api_key}",
+                "Content-Type": "application/json",
+            },
+            timeout=10.0,
+        )
 
-            data = response.json()
-            agents = data.get("agents", data if isinstance(data, list) else [])
-            return [
-                {
-                    "agent_id": agent.get("agent_id"),
-                    "agent_name": agent.get("agent_name"),
-                    "status": agent.get("status", "active"),
-                    "language": agent.get("language", "en-US"),
-                }
-                for agent in agents
-            ]
+        if response.status_code != 200:
+            logger.error(f"Failed to list agents: {response.text}")
+            raise Exception(f"Failed to list Retell agents: {response.text}")
+
+        data = response.json()
+        agents = data.get("agents", data if isinstance(data, list) else [])
+        return [
+            {
+                "agent_id": agent.get("agent_id"),
+                "agent_name": agent.get("agent_name"),
+                "status": agent.get("status", "active"),
+                "language": agent.get("language", "en-US"),
+            }
+            for agent in agents
+        ]
     
     # =========================================================================
     # Appointment Operations (calls backend API)
@@ -518,53 +527,53 @@ class RetellService:
                 }
             
             # Call backend to create registration token
-            async with httpx.AsyncClient() as client:
-                # Use internal service-to-service auth or API key
-                headers = {
-                    "Content-Type": "application/json",
-                    "X-Service-Key": getattr(self.settings, 'service_api_key', ''),
-                    # For development, we'll also support Clerk token
-                    "Authorization": f"Bearer {getattr(self.settings, 'clerk_api_key', '')}"
+            client = self._http_client
+            # Use internal service-to-service auth or API key
+            headers = {
+                "Content-Type": "application/json",
+                "X-Service-Key": getattr(self.settings, 'service_api_key', ''),
+                # For development, we'll also support Clerk token
+                "Authorization": f"Bearer {getattr(self.settings, 'clerk_api_key', '')}"
+            }
+            
+            response = await client.post(
+                f"{self.backend_url}/api/register/voice-intake",
+                headers=headers,
+                json={
+                    "phone": phone,
+                    "firstName": first_name,
+                    "lastName": last_name,
+                    "dateOfBirth": dob_parsed.strftime("%Y-%m-%d"),
+                    "reasonForVisit": reason_for_visit,
+                    "callId": call_id,
+                    "agentId": agent_id
+                },
+                timeout=30.0
+            )
+            
+            if response.status_code != 201:
+                logger.error(f"Failed to create registration: {response.text}")
+                return {
+                    "success": False,
+                    "message": "I'm having trouble with our registration system. Would you like me to transfer you to our staff?"
                 }
                 
-                response = await client.post(
-                    f"{self.backend_url}/api/register/voice-intake",
-                    headers=headers,
-                    json={
-                        "phone": phone,
-                        "firstName": first_name,
-                        "lastName": last_name,
-                        "dateOfBirth": dob_parsed.strftime("%Y-%m-%d"),
-                        "reasonForVisit": reason_for_visit,
-                        "callId": call_id,
-                        "agentId": agent_id
-                    },
-                    timeout=30.0
-                )
-                
-                if response.status_code != 201:
-                    logger.error(f"Failed to create registration: {response.text}")
-                    return {
-                        "success": False,
-                        "message": "I'm having trouble with our registration system. Would you like me to transfer you to our staff?"
-                    }
-                
-                result = response.json()
-                
-                # Trigger SMS send
-                sms_response = await client.post(
-                    f"{self.backend_url}/api/register/send-sms",
-                    headers=headers,
-                    json={
-                        "registrationTokenId": result.get("registrationTokenId"),
-                        "registrationUrl": result.get("registrationUrl")
-                    },
-                    timeout=30.0
-                )
-                
-                if sms_response.status_code != 200:
-                    logger.warning(f"Failed to send registration SMS: {sms_response.text}")
-                    # Continue anyway, we can tell user we'll send it
+            result = response.json()
+            
+            # Trigger SMS send
+            sms_response = await client.post(
+                f"{self.backend_url}/api/register/send-sms",
+                headers=headers,
+                json={
+                    "registrationTokenId": result.get("registrationTokenId"),
+                    "registrationUrl": result.get("registrationUrl")
+                },
+                timeout=30.0
+            )
+            
+            if sms_response.status_code != 200:
+                logger.warning(f"Failed to send registration SMS: {sms_response.text}")
+                # Continue anyway, we can tell user we'll send it
             
             return {
                 "success": True,
@@ -593,55 +602,55 @@ class RetellService:
         Used by AI to check if returning caller has incomplete registration.
         """
         try:
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    "Content-Type": "application/json",
-                    "X-Service-Key": getattr(self.settings, 'service_api_key', ''),
-                    "Authorization": f"Bearer {getattr(self.settings, 'clerk_api_key', '')}"
-                }
-                
-                # Normalize phone to E.164
-                cleaned_phone = "".join(filter(str.isdigit, phone))
-                if len(cleaned_phone) == 10:
-                    cleaned_phone = f"+1{cleaned_phone}"
-                elif not cleaned_phone.startswith("+"):
-                    cleaned_phone = f"+{cleaned_phone}"
-                
-                response = await client.get(
-                    f"{self.backend_url}/api/register/status/{cleaned_phone}",
-                    headers=headers,
-                    timeout=10.0
-                )
-                
-                if response.status_code != 200:
-                    return {"has_pending_registration": False}
+            client = self._http_client
+            headers = {
+                "Content-Type": "application/json",
+                "X-Service-Key": getattr(self.settings, 'service_api_key', ''),
+                "Authorization": f"Bearer {getattr(self.settings, 'clerk_api_key', '')}"
+            }
+            
+            # Normalize phone to E.164
+            cleaned_phone = "".join(filter(str.isdigit, phone))
+            if len(cleaned_phone) == 10:
+                cleaned_phone = f"+1{cleaned_phone}"
+            elif not cleaned_phone.startswith("+"):
+                cleaned_phone = f"+{cleaned_phone}"
                 
-                data = response.json()
+            response = await client.get(
+                f"{self.backend_url}/api/register/status/{cleaned_phone}",
+                headers=headers,
+                timeout=10.0
+            )
+            
+            if response.status_code != 200:
+                return {"has_pending_registration": False}
                 
-                if data.get("hasActiveRegistration"):
-                    stage = data.get("stage", "")
-                    
-                    if stage in ["voice_intake", "sms_sent"]:
-                        return {
-                            "has_pending_registration": True,
-                            "stage": stage,
-                            "message": "I see we sent you a registration link earlier. Did you get a chance to complete it? I can resend the link if you'd like."
-                        }
-                    elif stage in ["form_started", "form_incomplete"]:
-                        return {
-                            "has_pending_registration": True,
-                            "stage": stage,
-                            "message": "I can see you started your registration. Would you like me to resend the link so you can finish it?"
-                        }
-                    else:
-                        return {
-                            "has_pending_registration": True,
-                            "stage": stage,
-                            "message": "Your registration is being processed. Our team will contact you shortly."
-                        }
+            data = response.json()
+            
+            if data.get("hasActiveRegistration"):
+                stage = data.get("stage", "")
                 
-                return {"has_pending_registration": False}
+                if stage in ["voice_intake", "sms_sent"]:
+                    return {
+                        "has_pending_registration": True,
+                        "stage": stage,
+                        "message": "I see we sent you a registration link earlier. Did you get a chance to complete it? I can resend the link if you'd like."
+                    }
+                elif stage in ["form_started", "form_incomplete"]:
+                    return {
+                        "has_pending_registration": True,
+                        "stage": stage,
+                        "message": "I can see you started your registration. Would you like me to resend the link so you can finish it?"
+                    }
+                else:
+                    return {
+                        "has_pending_registration": True,
+                        "stage": stage,
+                        "message": "Your registration is being processed. Our team will contact you shortly."
+                    }
                 
+            return {"has_pending_registration": False}
+            
         except Exception as e:
             logger.warning(f"Error checking registration status: {e}")
             return {"has_pending_registration": False}
@@ -653,37 +662,37 @@ class RetellService:
     ) -> Dict[str, Any]:
         """Resend registration SMS to a patient with pending registration."""
         try:
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    "Content-Type": "application/json",
-                    "X-Service-Key": getattr(self.settings, 'service_api_key', ''),
-                    "Authorization": f"Bearer {getattr(self.settings, 'clerk_api_key', '')}"
-                }
-                
-                # Normalize phone
-                cleaned_phone = "".join(filter(str.isdigit, phone))
-                if len(cleaned_phone) == 10:
-                    cleaned_phone = f"+1{cleaned_phone}"
-                elif not cleaned_phone.startswith("+"):
-                    cleaned_phone = f"+{cleaned_phone}"
+            client = self._http_client
+            headers = {
+                "Content-Type": "application/json",
+                "X-Service-Key": getattr(self.settings, 'service_api_key', ''),
+                "Authorization": f"Bearer {getattr(self.settings, 'clerk_api_key', '')}"
+            }
+            
+            # Normalize phone
+            cleaned_phone = "".join(filter(str.isdigit, phone))
+            if len(cleaned_phone) == 10:
+                cleaned_phone = f"+1{cleaned_phone}"
+            elif not cleaned_phone.startswith("+"):
+                cleaned_phone = f"+{cleaned_phone}"
                 
-                response = await client.post(
-                    f"{self.backend_url}/api/register/resend-sms/{cleaned_phone}",
-                    headers=headers,
-                    timeout=30.0
-                )
+            response = await client.post(
+                f"{self.backend_url}/api/register/resend-sms/{cleaned_phone}",
+                headers=headers,
+                timeout=30.0
+            )
+            
+            if response.status_code == 200:
+                return {
+                    "success": True,
+                    "message": "I've resent the registration link to your phone. You should receive it in a moment."
+                }
+            else:
+                return {
+                    "success": False,
+                    "message": "I couldn't resend the link. Would you like to start a new registration?"
+                }
                 
-                if response.status_code == 200:
-                    return {
-                        "success": True,
-                        "message": "I've resent the registration link to your phone. You should receive it in a moment."
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "message": "I couldn't resend the link. Would you like to start a new registration?"
-                    }
-                    
         except Exception as e:
             logger.error(f"Error resending registration link: {e}")
             return {
@@ -1222,3 +1231,8 @@ class RetellService:
             
         except Exception as e:
             logger.error(f"Error processing call analysis: {e}")
+
+
+def get_retell_service(request: Request) -> RetellService:
+    """Dependency injection for Retell service (app-wide singleton)."""
+    return request.app.state.retell_service
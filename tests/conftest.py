@@ -0,0 +1,27 @@
+"""
+Shared fixtures for the AI service tests.
+
+No test talks to OpenAI, ElevenLabs or Postgres; clients are replaced with
+fakes, so only a placeholder API key is needed to construct services.
+"""
+
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from ai_service.cache import get_llm_cache  # noqa: E402
+from ai_service.clients import get_embedding_semaphore, get_llm_semaphore  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_process_state():
+    """Give every test its own LLM cache and semaphores (bound per event loop)."""
+    get_llm_cache.cache_clear()
+    get_llm_semaphore.cache_clear()
+    get_embedding_semaphore.cache_clear()
+    yield
+    get_llm_cache.cache_clear()
+    get_llm_semaphore.cache_clear()
+    get_embedding_semaphore.cache_clear()
@@ -0,0 +1,230 @@
+"""Tests for AIOrchestrator streaming, hedging and LLM slot accounting."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from ai_service.clients import get_llm_semaphore
+from ai_service.services.ai_orchestrator import AIOrchestrator, DeltaBatcher
+
+
+def content_chunk(text, finish_reason=None):
+    delta = SimpleNamespace(content=text, tool_calls=None)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+
+def tool_chunk(index, call_id=None, name=None, arguments=None, finish_reason=None):
+    tool_call = SimpleNamespace(
+        index=index, id=call_id, function=SimpleNamespace(name=name, arguments=arguments)
+    )
+    delta = SimpleNamespace(content=None, tool_calls=[tool_call])
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+
+class FakeStream:
+    """Async stream of chunks whose first chunk arrives after ``delay``."""
+
+    def __init__(self, name, delay=0.0, fail=False, chunks=None):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.chunks = list(chunks if chunks is not None else [content_chunk(f"{name}. ")])
+        self.started = False
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.started:
+            self.started = True
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError(f"{self.name} failed")
+        if not self.chunks:
+            raise StopAsyncIteration
+        return self.chunks.pop(0)
+
+    async def close(self):
+        self.closed = True
+
+
+def orchestrator_with(create, hedge=False, delay=0.02):
+    orchestrator = AIOrchestrator()
+    orchestrator.settings = orchestrator.settings.model_copy(
+        update={"voice_hedge_enabled": hedge, "voice_hedge_delay": delay}
+    )
+    orchestrator._openai_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    return orchestrator
+
+
+def streams_create(streams):
+    remaining = iter(streams)
+
+    async def create(**params):
+        return next(remaining)
+
+    return create
+
+
+async def settle():
+    """Let background cleanup of hedge losers run."""
+    await asyncio.sleep(0.05)
+
+
+def llm_slots_free():
+    semaphore = get_llm_semaphore()
+    return semaphore._value
+
+
+def test_delta_batcher_grows_batches_up_to_max():
+    batcher = DeltaBatcher(min_batch=1, max_batch=9, growth=3, flush_interval=60)
+    flushed = [text for text in (batcher.add(str(i % 10)) for i in range(20)) if text]
+
+    assert [len(text) for text in flushed] == [1, 3, 9]
+    assert batcher.flush() == "3456789"
+    assert batcher.flush() is None
+
+
+async def test_hedge_disabled_makes_a_single_attempt():
+    calls = 0
+
+    async def attempt():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "only"
+
+    orchestrator = orchestrator_with(None, hedge=False)
+    assert await orchestrator._hedged(attempt) == "only"
+    assert calls == 1
+
+
+async def test_hedge_uses_faster_second_attempt_and_cancels_first():
+    delays = iter([1.0, 0.01])
+    started = []
+
+    async def attempt():
+        delay = next(delays)
+        task = asyncio.current_task()
+        started.append(task)
+        await asyncio.sleep(delay)
+        return delay
+
+    orchestrator = orchestrator_with(None, hedge=True)
+    assert await orchestrator._hedged(attempt) == 0.01
+    await settle()
+    assert started[0].cancelled()
+
+
+async def test_hedge_survives_one_failed_attempt():
+    outcomes = iter([(0.05, None), (0.0, RuntimeError("boom"))])
+
+    async def attempt():
+        delay, error = next(outcomes)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return "first"
+
+    orchestrator = orchestrator_with(None, hedge=True)
+    assert await orchestrator._hedged(attempt) == "first"
+
+
+async def test_hedge_raises_when_every_attempt_fails():
+    async def attempt():
+        raise RuntimeError("boom")
+
+    orchestrator = orchestrator_with(None, hedge=True)
+    with pytest.raises(RuntimeError, match="boom"):
+        await orchestrator._hedged(attempt)
+
+
+async def test_hedge_discards_loser_that_already_succeeded():
+    discarded = []
+    second_started = asyncio.Event()
+    calls = 0
+
+    async def attempt():
+        # The hedge finishes first and wakes the original, so both have
+        # succeeded by the time the race is decided
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await second_started.wait()
+        else:
+            second_started.set()
+        return object()
+
+    async def discard(result):
+        discarded.append(result)
+
+    orchestrator = orchestrator_with(None, hedge=True, delay=0.01)
+    winner = await orchestrator._hedged(attempt, discard)
+    await settle()
+
+    assert len(discarded) == 1
+    assert discarded[0] is not winner
+
+
+async def test_hedged_voice_stream_releases_loser_slot_and_closes_it():
+    slow, fast = FakeStream("slow", delay=1.0), FakeStream("fast", delay=0.0)
+    orchestrator = orchestrator_with(streams_create([slow, fast]), hedge=True)
+    free = llm_slots_free()
+
+    events = [event async for event in orchestrator.stream_voice_response([])]
+    await settle()
+
+    assert events == [{"type": "content", "content": "fast. "}]
+    assert fast.closed and slow.closed
+    assert llm_slots_free() == free
+
+
+async def test_hedged_voice_stream_falls_back_when_first_fails():
+    failing, healthy = FakeStream("bad", delay=0.05, fail=True), FakeStream("good", delay=0.1)
+    orchestrator = orchestrator_with(streams_create([failing, healthy]), hedge=True)
+    free = llm_slots_free()
+
+    events = [event async for event in orchestrator.stream_voice_response([])]
+    await settle()
+
+    assert events == [{"type": "content", "content": "good. "}]
+    assert llm_slots_free() == free
+
+
+async def test_stream_slot_is_released_when_consumer_stops_early():
+    stream = FakeStream("long", chunks=[content_chunk(f"{i}. ") for i in range(10)])
+    orchestrator = orchestrator_with(streams_create([stream]))
+    free = llm_slots_free()
+
+    completion = orchestrator._stream_completion({})
+    await completion.__anext__()
+    assert llm_slots_free() == free - 1
+    await completion.aclose()
+
+    assert stream.closed
+    assert llm_slots_free() == free
+
+
+async def test_stream_chat_emits_parsed_tool_calls_after_content():
+    stream = FakeStream(
+        "tools",
+        chunks=[
+            content_chunk("Let me check."),
+            tool_chunk(0, "call_1", "lookup_patient", '{"phone": '),
+            tool_chunk(0, arguments='"5551234567"}'),
+            tool_chunk(1, "call_2", "check_availability", "", finish_reason="tool_calls"),
+        ],
+    )
+    orchestrator = orchestrator_with(streams_create([stream]))
+
+    events = [event async for event in orchestrator._stream_chat({})]
+
+    assert events[0] == {"type": "content", "content": "Let me check."}
+    assert [event["tool_call"]["function"] for event in events[1:]] == [
+        {"name": "lookup_patient", "arguments": {"phone": "5551234567"}},
+        {"name": "check_availability", "arguments": {}},
+    ]
@@ -0,0 +1,153 @@
+"""Tests for the in-process TTL cache and cache key helpers."""
+
+import asyncio
+
+import pytest
+
+from ai_service import cache
+from ai_service.cache import TTLCache, llm_cache_key, normalized_text
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", fake)
+    return fake
+
+
+def test_entries_expire_after_ttl(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl=5)
+    ttl_cache.set("a", 1)
+
+    clock.now += 4.9
+    assert ttl_cache.get("a") == 1
+
+    clock.now += 0.2
+    assert ttl_cache.get("a") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    ttl_cache = TTLCache(maxsize=2, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("c") == 3
+
+
+async def test_concurrent_misses_share_one_load():
+    ttl_cache = TTLCache(maxsize=10, ttl=60)
+    release = asyncio.Event()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "value"
+
+    waiters = [asyncio.create_task(ttl_cache.get_or_load("key", loader)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["value"] * 5
+    assert calls == 1
+    assert await ttl_cache.get_or_load("key", loader) == "value"
+    assert calls == 1
+
+
+async def test_failed_load_is_shared_but_not_cached():
+    ttl_cache = TTLCache(maxsize=10, ttl=60)
+    release = asyncio.Event()
+    calls = 0
+
+    async def failing_loader():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        raise RuntimeError("upstream down")
+
+    waiters = [asyncio.create_task(ttl_cache.get_or_load("key", failing_loader)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert calls == 1
+    assert ttl_cache.get("key") is None
+
+    async def loader():
+        return "recovered"
+
+    assert await ttl_cache.get_or_load("key", loader) == "recovered"
+
+
+async def test_should_cache_false_skips_storing():
+    ttl_cache = TTLCache(maxsize=10, ttl=60)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        return {"intent": "unknown"}
+
+    def should_cache(value):
+        return value["intent"] != "unknown"
+
+    await ttl_cache.get_or_load("key", loader, should_cache)
+    await ttl_cache.get_or_load("key", loader, should_cache)
+
+    assert calls == 2
+    assert ttl_cache.get("key") is None
+
+
+async def test_cancelled_caller_does_not_cancel_shared_load():
+    ttl_cache = TTLCache(maxsize=10, ttl=60)
+    release = asyncio.Event()
+
+    async def loader():
+        await release.wait()
+        return "value"
+
+    first = asyncio.create_task(ttl_cache.get_or_load("key", loader))
+    second = asyncio.create_task(ttl_cache.get_or_load("key", loader))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "value"
+    assert ttl_cache.get("key") == "value"
+
+
+async def test_expired_entry_is_reloaded(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl=5)
+    values = iter(["old", "new"])
+
+    async def loader():
+        return next(values)
+
+    assert await ttl_cache.get_or_load("key", loader) == "old"
+    clock.now += 6
+    assert await ttl_cache.get_or_load("key", loader) == "new"
+
+
+def test_normalized_text_folds_case_punctuation_and_spacing():
+    assert normalized_text("  I need to CANCEL,  my appointment!! ") == normalized_text(
+        "i need to cancel my appointment"
+    )
+
+
+def test_llm_cache_key_ignores_dict_order():
+    assert llm_cache_key("op", {"a": 1, "b": 2}) == llm_cache_key("op", {"b": 2, "a": 1})
+    assert llm_cache_key("op", {"a": 1}) != llm_cache_key("op", {"a": 2})
@@ -0,0 +1,95 @@
+"""Tests for the intent fast path, result copies and the micro-batcher."""
+
+import asyncio
+
+import pytest
+
+from ai_service.services.intent_service import IntentBatcher, IntentService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """IntentService whose LLM classification is replaced by a counter."""
+    intent_service = IntentService()
+    intent_service.llm_calls = []
+
+    async def classify(tenant_id, message, context=None):
+        fast_result = intent_service.classify_without_llm(tenant_id, message, context)
+        if fast_result is not None:
+            return fast_result
+        intent_service.llm_calls.append(message)
+        await asyncio.sleep(0)
+        return {
+            "primary_intent": {"intent": "general_inquiry", "confidence": 0.9, "entities": {}},
+            "secondary_intents": [],
+            "suggested_response": "",
+            "requires_human": False,
+        }
+
+    monkeypatch.setattr(intent_service, "classify", classify)
+    return intent_service
+
+
+@pytest.mark.parametrize(
+    "message, intent",
+    [
+        ("I need to cancel my appointment", "cancel_appointment"),
+        ("I want to book an appointment", "schedule_appointment"),
+        ("I have a dental emergency", "emergency"),
+        ("Transfer me to a person", "speak_to_human"),
+        ("What is your cancellation policy for an appointment?", None),
+        ("Is there a fee if I cancel my appointment late?", None),
+        ("Do you have emergency hours on weekends?", None),
+        ("I don't want to cancel my appointment", None),
+        ("Cancel my appointment and book a cleaning", None),
+    ],
+)
+def test_fast_path_only_answers_unambiguous_requests(message, intent):
+    assert IntentService()._fast_classify(message) == intent
+
+
+async def test_batch_duplicates_get_independent_copies(service):
+    results = await service.classify_batch([("t1", "hello there", None)] * 3)
+
+    assert service.llm_calls == ["hello there"]
+    results[0]["primary_intent"]["entities"]["name"] = "changed"
+    assert results[1]["primary_intent"]["entities"] == {}
+
+
+async def test_batcher_answers_fast_path_without_queueing(service, monkeypatch):
+    batcher = IntentBatcher(service, window_ms=1000)
+    batcher.start()
+    dispatched = []
+    monkeypatch.setattr(batcher, "_dispatch", dispatched.append)
+    try:
+        result = await asyncio.wait_for(
+            batcher.classify("t1", "I need to cancel my appointment"), timeout=0.1
+        )
+    finally:
+        await batcher.stop()
+
+    assert result["primary_intent"]["intent"] == "cancel_appointment"
+    assert dispatched == []
+
+
+async def test_batcher_coalesces_requests_that_need_the_llm(service):
+    batcher = IntentBatcher(service, window_ms=20)
+    batched = []
+    classify_batch = service.classify_batch
+
+    async def record_batch(requests):
+        batched.append(len(requests))
+        return await classify_batch(requests)
+
+    service.classify_batch = record_batch
+    batcher.start()
+    try:
+        results = await asyncio.gather(
+            *[batcher.classify("t1", message) for message in ["hi", "hi", "what now"]]
+        )
+    finally:
+        await batcher.stop()
+
+    assert batched == [3]
+    assert sorted(service.llm_calls) == ["hi", "what now"]
+    assert all(r["primary_intent"]["intent"] == "general_inquiry" for r in results)
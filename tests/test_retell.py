@@ -0,0 +1,67 @@
+"""Tests for Retell transcript mirroring and frame size checks."""
+
+from ai_service.routers.retell import MAX_FRAME_SIZE, ConversationHistory, frame_size
+
+
+def utterance(role, content):
+    return {"role": role, "content": content}
+
+
+def history_messages(history):
+    # Skip the system message
+    return [(m["role"], m["content"]) for m in history.messages[1:]]
+
+
+def test_sync_appends_only_new_utterances():
+    history = ConversationHistory()
+    transcript = [utterance("agent", "Hello"), utterance("user", "Hi")]
+    history.sync(transcript)
+    history.sync(transcript + [utterance("agent", "How can I help?")])
+
+    assert history_messages(history) == [
+        ("assistant", "Hello"),
+        ("user", "Hi"),
+        ("assistant", "How can I help?"),
+    ]
+
+
+def test_sync_replaces_final_utterance_rewritten_while_speaking():
+    history = ConversationHistory()
+    history.sync([utterance("agent", "Hello"), utterance("user", "I want")])
+    history.sync([utterance("agent", "Hello"), utterance("user", "I want to book")])
+
+    assert history_messages(history) == [("assistant", "Hello"), ("user", "I want to book")]
+    assert history.last_user_message == "I want to book"
+
+
+def test_sync_fills_in_final_utterance_that_was_empty():
+    history = ConversationHistory()
+    history.sync([utterance("agent", "Hello"), utterance("user", "")])
+    history.sync([utterance("agent", "Hello"), utterance("user", "Hi there")])
+
+    assert history_messages(history) == [("assistant", "Hello"), ("user", "Hi there")]
+
+
+def test_sync_does_not_drop_earlier_message_after_empty_tail():
+    history = ConversationHistory()
+    history.sync([utterance("agent", "Hello"), utterance("user", "")])
+    history.sync(
+        [utterance("agent", "Hello"), utterance("user", ""), utterance("agent", "Still there?")]
+    )
+
+    assert history_messages(history) == [("assistant", "Hello"), ("assistant", "Still there?")]
+
+
+def test_sync_rebuilds_when_transcript_restarts():
+    history = ConversationHistory()
+    history.sync([utterance("agent", "Hello"), utterance("user", "Hi"), utterance("agent", "Ok")])
+    history.sync([utterance("agent", "Welcome back")])
+
+    assert history_messages(history) == [("assistant", "Welcome back")]
+    assert history.last_user_message is None
+
+
+def test_frame_size_counts_utf8_bytes():
+    assert frame_size(b"x" * 10) == 10
+    assert frame_size("é" * 300_000) == 600_000
+    assert frame_size("€" * 400_000) > MAX_FRAME_SIZE
@@ -0,0 +1,43 @@
+"""Tests for rule-based registration field extraction in the voice agent."""
+
+import pytest
+
+from ai_service.routers.voice_agent import extract_fields
+
+
+@pytest.mark.parametrize(
+    "text, current_field, expected",
+    [
+        ("My name is John McDonald", "firstName", {"firstName": "John", "lastName": "McDonald"}),
+        ("Yes, this is Sarah", "firstName", {"firstName": "Sarah"}),
+        ("it's o'Brien", "lastName", {"lastName": "O'Brien"}),
+        ("Hold on", "firstName", {}),
+        ("Thank you", "firstName", {}),
+        ("I dunno", "firstName", {}),
+        ("John", "firstName", {}),
+        ("it's fine", "firstName", {}),
+        ("My name is John", "phone", {}),
+    ],
+)
+def test_names_need_an_explicit_cue(text, current_field, expected):
+    assert extract_fields(text, current_field) == expected
+
+
+def test_contact_details_are_found_anywhere():
+    fields = extract_fields(
+        "Sure, it's (555) 123-4567 and my email is Jane.Doe@Example.com.", "phone"
+    )
+
+    assert fields == {"phone": "5551234567", "email": "jane.doe@example.com"}
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("I was born 03/14/1985", "03/14/1985"),
+        ("March 4th, 1990", "03/04/1990"),
+        ("02/30/1990", None),
+    ],
+)
+def test_date_of_birth_is_normalized(text, expected):
+    assert extract_fields(text, "dateOfBirth").get("dateOfBirth") == expected